@@ -5,7 +5,6 @@ OCR controller for handling OCR business logic.
 import uuid
 import asyncio
 import time
-import json
 from datetime import datetime, UTC
 from pathlib import Path
 from typing import Dict, Optional, AsyncGenerator
@@ -20,17 +19,28 @@ from app.models.ocr_models import (
     PDFOCRRequest, PDFOCRResponse, PDFOCRResult,
     PDFLLMOCRRequest, PDFLLMOCRResponse, PDFLLMOCRResult,
     ImagePreprocessResult, ImagePreprocessResponse,
-    CancelTaskRequest, CancelTaskResponse, TaskCancellationError, TaskStatus
+    CancelTaskRequest, CancelTaskResponse, TaskCancellationError, TaskStatus,
+    DEFAULT_CANCELLATION_REASON, STREAM_END
 )
 from app.services.external_ocr_service import external_ocr_service
 from app.services.ocr_llm_service import ocr_llm_service
 from app.services.pdf_ocr_service import pdf_ocr_service
+from app.utils.sse import sse_event
 from config.settings import get_settings
 
 logger = get_logger(__name__)
 settings = get_settings()
 
 
+def _now() -> datetime:
+    """Return the current UTC time (single seam for tests to freeze the clock)."""
+    return datetime.now(UTC)
+
+
+# Constant payload for unknown streams, serialized once at import time
+_TASK_NOT_FOUND_SSE = sse_event({'error': 'Task not found'})
+
+
 class OCRController:
     """Controller for OCR operations."""
     
@@ -44,14 +54,27 @@ class OCRController:
         self.preprocess_tasks: Dict[str, ImagePreprocessResponse] = {}
         # New streaming queues for real-time updates
         self.streaming_queues: Dict[str, asyncio.Queue] = {}
-        # Task cancellation tracking
-        self.cancelled_tasks: set = set()
+        # Task cancellation tracking (task_id -> reason); membership means cancelled
         self.cancellation_reasons: Dict[str, str] = {}
         self.executor = ThreadPoolExecutor(
             max_workers=settings.MAX_CONCURRENT_TASKS
         )
         logger.info("OCR Controller initialized with streaming support and task cancellation")
     
+    def reset_state(self) -> None:
+        """
+        Clear all in-memory task tracking without recreating the controller.
+        
+        The dictionaries are cleared in place so existing references stay valid.
+        """
+        self.tasks.clear()
+        self.llm_tasks.clear()
+        self.pdf_tasks.clear()
+        self.pdf_llm_tasks.clear()
+        self.preprocess_tasks.clear()
+        self.streaming_queues.clear()
+        self.cancellation_reasons.clear()
+    
     async def process_image(
         self, 
         file: UploadFile, 
@@ -1492,15 +1515,18 @@ class OCRController:
             self.pdf_llm_tasks[task_id] = error_response
             return error_response
 
-    async def stream_pdf_progress(self, task_id: str) -> AsyncGenerator[str, None]:
+    async def stream_pdf_progress(self, task_id: str) -> AsyncGenerator[bytes, None]:
         """
         Stream PDF processing progress via Server-Sent Events.
         
+        The stream ends when the STREAM_END sentinel is read from the task's
+        queue; producers put it after the final update or on cancellation.
+        
         Args:
             task_id: Unique task identifier
             
         Yields:
-            str: Server-Sent Events formatted progress updates
+            bytes: Server-Sent Events formatted progress updates
             
         Raises:
             HTTPException: If task not found
@@ -1508,7 +1534,7 @@ class OCRController:
         # Check if task exists
         if task_id not in self.streaming_queues:
             logger.warning(f"Streaming task {task_id} not found")
-            yield f"data: {json.dumps({'error': 'Task not found'})}\n\n"
+            yield _TASK_NOT_FOUND_SSE
             return
         
         queue = self.streaming_queues[task_id]
@@ -1520,25 +1546,24 @@ class OCRController:
                     # Wait for update with timeout
                     update = await asyncio.wait_for(queue.get(), timeout=30.0)
                     
-                    # Check for sentinel (None = stream complete)
-                    if update is None:
+                    # Check for end-of-stream sentinel
+                    if update is STREAM_END:
                         logger.info(f"Stream completed for task {task_id}")
                         break
                     
-                    # Convert update to JSON and send as SSE
-                    update_json = update.model_dump_json()
-                    yield f"data: {update_json}\n\n"
+                    # Serialize update straight to JSON bytes and send as SSE
+                    yield sse_event(update)
                     
                     logger.debug(f"Sent streaming update for {task_id}: {update.status}")
                     
                 except asyncio.TimeoutError:
                     # Send keepalive
-                    yield f"data: {json.dumps({'keepalive': True, 'timestamp': datetime.now(UTC).isoformat()})}\n\n"
+                    yield sse_event({'keepalive': True, 'timestamp': datetime.now(UTC)})
                     logger.debug(f"Sent keepalive for task {task_id}")
                     
         except Exception as e:
             logger.error(f"Stream error for task {task_id}: {str(e)}")
-            yield f"data: {json.dumps({'error': f'Stream error: {str(e)}'})}\n\n"
+            yield sse_event({'error': f'Stream error: {str(e)}'})
             
         finally:
             # Cleanup streaming queue
@@ -1690,9 +1715,9 @@ class OCRController:
         Returns:
             bool: True if task is cancelled
         """
-        return task_id in self.cancelled_tasks
+        return task_id in self.cancellation_reasons
 
-    async def cancel_ocr_task(self, task_id: str, reason: str = "User requested cancellation") -> CancelTaskResponse:
+    async def cancel_ocr_task(self, task_id: str, reason: str = DEFAULT_CANCELLATION_REASON) -> CancelTaskResponse:
         """
         Cancel an OCR task.
         
@@ -1719,11 +1744,10 @@ class OCRController:
             )
         
         # Mark task as cancelled
-        self.cancelled_tasks.add(task_id)
         self.cancellation_reasons[task_id] = reason
         
         # Update task status
-        cancelled_at = datetime.now(UTC)
+        cancelled_at = _now()
         task.status = TaskStatus.CANCELLED
         task.cancellation_reason = reason
         task.cancelled_at = cancelled_at
@@ -1739,7 +1763,7 @@ class OCRController:
             cancellation_reason=reason
         )
 
-    async def cancel_pdf_task(self, task_id: str, reason: str = "User requested cancellation") -> CancelTaskResponse:
+    async def cancel_pdf_task(self, task_id: str, reason: str = DEFAULT_CANCELLATION_REASON) -> CancelTaskResponse:
         """
         Cancel a PDF OCR task.
         
@@ -1766,11 +1790,10 @@ class OCRController:
             )
         
         # Mark task as cancelled
-        self.cancelled_tasks.add(task_id)
         self.cancellation_reasons[task_id] = reason
         
         # Update task status
-        cancelled_at = datetime.now(UTC)
+        cancelled_at = _now()
         task.status = TaskStatus.CANCELLED
         task.cancellation_reason = reason
         task.cancelled_at = cancelled_at
@@ -1779,7 +1802,7 @@ class OCRController:
         # Send cancellation to streaming queue if exists
         if task_id in self.streaming_queues:
             try:
-                await self.streaming_queues[task_id].put(None)  # Signal stream end
+                await self.streaming_queues[task_id].put(STREAM_END)  # Signal stream end
             except Exception as e:
                 logger.warning(f"Failed to signal stream cancellation for {task_id}: {e}")
         
@@ -1793,7 +1816,7 @@ class OCRController:
             cancellation_reason=reason
         )
 
-    async def cancel_pdf_llm_task(self, task_id: str, reason: str = "User requested cancellation") -> CancelTaskResponse:
+    async def cancel_pdf_llm_task(self, task_id: str, reason: str = DEFAULT_CANCELLATION_REASON) -> CancelTaskResponse:
         """
         Cancel a PDF LLM OCR task.
         
@@ -1820,11 +1843,10 @@ class OCRController:
             )
         
         # Mark task as cancelled
-        self.cancelled_tasks.add(task_id)
         self.cancellation_reasons[task_id] = reason
         
         # Update task status
-        cancelled_at = datetime.now(UTC)
+        cancelled_at = _now()
         task.status = TaskStatus.CANCELLED
         task.cancellation_reason = reason
         task.cancelled_at = cancelled_at
@@ -1833,7 +1855,7 @@ class OCRController:
         # Send cancellation to streaming queue if exists
         if task_id in self.streaming_queues:
             try:
-                await self.streaming_queues[task_id].put(None)  # Signal stream end
+                await self.streaming_queues[task_id].put(STREAM_END)  # Signal stream end
             except Exception as e:
                 logger.warning(f"Failed to signal stream cancellation for {task_id}: {e}")
         
@@ -1847,7 +1869,7 @@ class OCRController:
             cancellation_reason=reason
         )
 
-    async def cancel_llm_task(self, task_id: str, reason: str = "User requested cancellation") -> CancelTaskResponse:
+    async def cancel_llm_task(self, task_id: str, reason: str = DEFAULT_CANCELLATION_REASON) -> CancelTaskResponse:
         """
         Cancel an LLM OCR task.
         
@@ -1874,11 +1896,10 @@ class OCRController:
             )
         
         # Mark task as cancelled
-        self.cancelled_tasks.add(task_id)
         self.cancellation_reasons[task_id] = reason
         
         # Update task status
-        cancelled_at = datetime.now(UTC)
+        cancelled_at = _now()
         task.status = TaskStatus.CANCELLED
         task.cancellation_reason = reason
         task.cancelled_at = cancelled_at
@@ -1894,7 +1915,7 @@ class OCRController:
             cancellation_reason=reason
         )
 
-    async def cancel_streaming_task(self, task_id: str, reason: str = "User requested cancellation") -> CancelTaskResponse:
+    async def cancel_streaming_task(self, task_id: str, reason: str = DEFAULT_CANCELLATION_REASON) -> CancelTaskResponse:
         """
         Cancel a streaming task (PDF or PDF LLM).
         
@@ -3,6 +3,8 @@ Pydantic models for OCR operations using external API.
 """
 
 import base64
+import sys
+from dataclasses import dataclass
 from datetime import datetime
 from typing import List, Optional, Dict, Any, Union
 from enum import Enum
@@ -672,6 +674,26 @@ class PDFLLMOCRResponse(BaseModel):
 
 # --- PDF Streaming Models ---
 
+@dataclass(slots=True, frozen=True)
+class PDFPageStreamRow:
+    """
+    Compact per-page streaming record.
+    
+    Used for the service's internal cumulative results list, which grows with
+    every processed page; a slotted dataclass is much smaller than a Pydantic
+    model instance. Rows are converted with PDFPageStreamResult.from_row only
+    when a status update is emitted.
+    """
+    page_number: int
+    extracted_text: str
+    processing_time: float
+    success: bool
+    error_message: Optional[str]
+    threshold_used: int
+    contrast_level_used: float
+    timestamp: datetime
+
+
 class PDFPageStreamResult(BaseModel):
     """Streaming result for a single PDF page."""
     page_number: int = Field(description="Page number (1-indexed)")
@@ -686,6 +708,26 @@ class PDFPageStreamResult(BaseModel):
     contrast_level_used: float = Field(description="Contrast level used for this page")
     timestamp: datetime = Field(description="Timestamp when page processing completed")
     
+    @classmethod
+    def from_row(cls, row: PDFPageStreamRow) -> "PDFPageStreamResult":
+        """
+        Build a result model from a compact PDFPageStreamRow.
+        
+        Rows are produced in-process by the PDF service, so this skips
+        validation via model_construct; use the regular constructor for
+        untrusted input.
+        """
+        return cls.model_construct(
+            page_number=row.page_number,
+            extracted_text=row.extracted_text,
+            processing_time=row.processing_time,
+            success=row.success,
+            error_message=row.error_message,
+            threshold_used=row.threshold_used,
+            contrast_level_used=row.contrast_level_used,
+            timestamp=row.timestamp
+        )
+    
     class Config:
         """Pydantic model configuration."""
         json_schema_extra = {
@@ -716,7 +758,14 @@ class PDFStreamingStatus(BaseModel):
     )
     cumulative_results: List[PDFPageStreamResult] = Field(
         default=[],
-        description="All processed page results so far (Type 2: complete state)"
+        description="All processed page results so far (Type 2: complete state); "
+                    "empty on per-page delta updates (is_snapshot=False)"
+    )
+    is_snapshot: bool = Field(
+        default=True,
+        description="False on per-page delta updates, which carry only latest_page_result "
+                    "and leave cumulative_results empty; clients accumulate latest_page_result "
+                    "until the next snapshot"
     )
     progress_percentage: float = Field(description="Processing progress percentage (0-100)")
     estimated_time_remaining: Optional[float] = Field(
@@ -815,7 +864,14 @@ class PDFLLMStreamingStatus(BaseModel):
     )
     cumulative_results: List[PDFPageLLMStreamResult] = Field(
         default=[],
-        description="All processed page results so far (Type 2: complete state)"
+        description="All processed page results so far (Type 2: complete state); "
+                    "empty on per-page delta updates (is_snapshot=False)"
+    )
+    is_snapshot: bool = Field(
+        default=True,
+        description="False on per-page delta updates, which carry only latest_page_result "
+                    "and leave cumulative_results empty; clients accumulate latest_page_result "
+                    "until the next snapshot"
     )
     progress_percentage: float = Field(description="Processing progress percentage (0-100)")
     estimated_time_remaining: Optional[float] = Field(
@@ -862,10 +918,14 @@ class TaskStatus(str, Enum):
     CANCELLED = "cancelled"
 
 
+# Shared default so every cancellation path uses the same interned string
+DEFAULT_CANCELLATION_REASON = sys.intern("User requested cancellation")
+
+
 class CancelTaskRequest(BaseModel):
     """Request model for task cancellation."""
     reason: Optional[str] = Field(
-        default="User requested cancellation",
+        default=DEFAULT_CANCELLATION_REASON,
         description="Reason for cancellation"
     )
     
@@ -908,6 +968,19 @@ class TaskCancellationError(Exception):
         super().__init__(f"Task {task_id} was cancelled: {reason}")
 
 
+class StreamEnd:
+    """Sentinel type marking the end of a streaming progress queue."""
+    
+    __slots__ = ()
+    
+    def __repr__(self) -> str:
+        return "STREAM_END"
+
+
+# Single instance put on streaming queues after the last update; compare with `is`
+STREAM_END = StreamEnd()
+
+
 # --- Image Preprocessing Models ---
 
 class ImagePreprocessResult(BaseModel):
@@ -1399,6 +1399,8 @@ async def stream_pdf_progress(request: Request, task_id: str):
     
     This endpoint provides Server-Sent Events (SSE) for monitoring PDF processing progress.
     It provides both incremental updates (latest_page_result) and complete state (cumulative_results).
+    Page updates are deltas: cumulative_results is only filled every PDF_STREAM_SNAPSHOT_INTERVAL
+    pages and in the final completion update.
     
     Args:
         task_id: Unique task identifier from the streaming processing request
@@ -1416,7 +1418,7 @@ async def stream_pdf_progress(request: Request, task_id: str):
             "total_pages": 5,
             "processed_pages": 2,
             "latest_page_result": { ... },      // Single page result
-            "cumulative_results": [ ... ],      // All pages processed so far
+            "cumulative_results": [],           // Empty except on snapshot pages
             "progress_percentage": 40.0,
             "estimated_time_remaining": 6.3,
             "processing_speed": 0.48
@@ -274,7 +274,8 @@ async def process_any_file_stream(
         "progress_percentage": 45.2,
         "current_step": "ocr_processing",
         "latest_page_result": {...},     // Type 1: Latest result
-        "cumulative_results": [...],     // Type 2: All results
+        "cumulative_results": [...],     // Type 2: All results (empty when is_snapshot is false)
+        "is_snapshot": true,             // PDF only: false on per-page delta updates
         "estimated_time_remaining": 15.3
     }
     ```
@@ -290,6 +291,8 @@ async def process_any_file_stream(
         updateProgress(update.progress_percentage);
         
         // Handle new results (works for any file type!)
+        // PDF per-page updates with is_snapshot === false leave
+        // cumulative_results empty, so accumulate latest_page_result in between
         if (update.latest_page_result) {
             displayNewResult(update.latest_page_result);
         }
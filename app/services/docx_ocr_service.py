@@ -20,7 +20,7 @@ from app.models.unified_models import (
 )
 from app.services.libreoffice_client import libreoffice_client, LibreOfficeConversionError
 from app.services.pdf_ocr_service import pdf_ocr_service
-from app.models.ocr_models import PDFOCRRequest, PDFLLMOCRRequest
+from app.models.ocr_models import PDFOCRRequest, PDFLLMOCRRequest, STREAM_END
 from app.logger_config import get_logger
 
 UTC = timezone.utc
@@ -364,54 +364,38 @@ class DOCXOCRService:
             task_id: Task identifier
             mode: Processing mode
         """
+        # PDF delta frames (is_snapshot=False) carry no result list, so the
+        # relay keeps its own converted results keyed by page number
+        converted_results: Dict[int, UnifiedPageResult] = {}
+        
         try:
             while True:
                 # Get PDF progress update
                 pdf_update = await pdf_queue.get()
                 
                 # Check for stream end sentinel
-                if pdf_update is None:
+                if pdf_update is STREAM_END:
                     break
                 
                 # Calculate adjusted progress (25% to 100%)
                 original_progress = pdf_update.progress_percentage
                 adjusted_progress = 25.0 + (original_progress * 0.75)
                 
-                # Convert latest PDF result to unified format if present
+                # Convert the new page result, if any, and remember it
                 unified_latest_result = None
-                if hasattr(pdf_update, 'latest_page_result') and pdf_update.latest_page_result:
-                    pdf_result = pdf_update.latest_page_result
-                    unified_latest_result = UnifiedPageResult(
-                        page_number=pdf_result.page_number,
-                        extracted_text=pdf_result.extracted_text,
-                        processing_time=pdf_result.processing_time,
-                        success=pdf_result.success,
-                        threshold_used=pdf_result.threshold_used,
-                        contrast_level_used=pdf_result.contrast_level_used,
-                        image_processing_time=getattr(pdf_result, 'image_processing_time', None),
-                        llm_processing_time=getattr(pdf_result, 'llm_processing_time', None),
-                        model_used=getattr(pdf_result, 'model_used', None),
-                        prompt_used=getattr(pdf_result, 'prompt_used', None),
-                        timestamp=pdf_result.timestamp
-                    )
+                if pdf_update.latest_page_result:
+                    unified_latest_result = self._to_unified_result(pdf_update.latest_page_result)
+                    converted_results[unified_latest_result.page_number] = unified_latest_result
                 
-                # Convert cumulative results
-                unified_cumulative_results = []
-                if hasattr(pdf_update, 'cumulative_results') and pdf_update.cumulative_results:
-                    for pdf_result in pdf_update.cumulative_results:
-                        unified_cumulative_results.append(UnifiedPageResult(
-                            page_number=pdf_result.page_number,
-                            extracted_text=pdf_result.extracted_text,
-                            processing_time=pdf_result.processing_time,
-                            success=pdf_result.success,
-                            threshold_used=pdf_result.threshold_used,
-                            contrast_level_used=pdf_result.contrast_level_used,
-                            image_processing_time=getattr(pdf_result, 'image_processing_time', None),
-                            llm_processing_time=getattr(pdf_result, 'llm_processing_time', None),
-                            model_used=getattr(pdf_result, 'model_used', None),
-                            prompt_used=getattr(pdf_result, 'prompt_used', None),
-                            timestamp=pdf_result.timestamp
-                        ))
+                # Snapshot and final frames carry the full list; only convert pages not seen yet
+                for pdf_result in pdf_update.cumulative_results:
+                    if pdf_result.page_number not in converted_results:
+                        converted_results[pdf_result.page_number] = self._to_unified_result(pdf_result)
+                
+                # Unified frames always carry the full list (no delta frames)
+                unified_cumulative_results = sorted(
+                    converted_results.values(), key=lambda r: r.page_number
+                )
                 
                 # Send unified progress update
                 await self._send_progress(
@@ -420,7 +404,9 @@ class DOCXOCRService:
                     adjusted_progress,
                     f"Processing PDF page {pdf_update.current_page}/{pdf_update.total_pages}",
                     unified_latest_result,
-                    unified_cumulative_results
+                    unified_cumulative_results,
+                    total_pages=pdf_update.total_pages,
+                    processed_pages=pdf_update.processed_pages
                 )
                 
         except asyncio.CancelledError:
@@ -428,6 +414,23 @@ class DOCXOCRService:
         except Exception as e:
             logger.error(f"PDF progress translation failed for task {task_id}: {e}")
     
+    @staticmethod
+    def _to_unified_result(pdf_result) -> UnifiedPageResult:
+        """Convert a PDF page result to unified format."""
+        return UnifiedPageResult(
+            page_number=pdf_result.page_number,
+            extracted_text=pdf_result.extracted_text,
+            processing_time=pdf_result.processing_time,
+            success=pdf_result.success,
+            threshold_used=pdf_result.threshold_used,
+            contrast_level_used=pdf_result.contrast_level_used,
+            image_processing_time=getattr(pdf_result, 'image_processing_time', None),
+            llm_processing_time=getattr(pdf_result, 'llm_processing_time', None),
+            model_used=getattr(pdf_result, 'model_used', None),
+            prompt_used=getattr(pdf_result, 'prompt_used', None),
+            timestamp=pdf_result.timestamp
+        )
+    
     async def _send_progress(
         self,
         queue: asyncio.Queue,
@@ -437,9 +440,17 @@ class DOCXOCRService:
         progress: float,
         message: str,
         result: Optional[UnifiedPageResult] = None,
-        cumulative_results: Optional[List[UnifiedPageResult]] = None
+        cumulative_results: Optional[List[UnifiedPageResult]] = None,
+        total_pages: Optional[int] = None,
+        processed_pages: Optional[int] = None
     ):
         """Send progress update to streaming queue."""
+        # Page counts default to the cumulative list when not given explicitly
+        if total_pages is None:
+            total_pages = len(cumulative_results) if cumulative_results else 1
+        if processed_pages is None:
+            processed_pages = len(cumulative_results) if cumulative_results else 0
+        
         try:
             update = UnifiedStreamingStatus(
                 task_id=task_id,
@@ -449,8 +460,8 @@ class DOCXOCRService:
                 current_step=step,
                 progress_percentage=progress,
                 current_page=result.page_number if result else 1,
-                total_pages=len(cumulative_results) if cumulative_results else 1,
-                processed_pages=len(cumulative_results) if cumulative_results else 0,
+                total_pages=total_pages,
+                processed_pages=processed_pages,
                 latest_page_result=result,
                 cumulative_results=cumulative_results or [],
                 timestamp=datetime.now(UTC)
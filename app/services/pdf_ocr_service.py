@@ -6,7 +6,7 @@ import asyncio
 import time
 import gc
 from pathlib import Path
-from typing import List, Optional
+from typing import Dict, List, Optional
 import tempfile
 import os
 from datetime import datetime, UTC
@@ -22,8 +22,8 @@ from app.models.ocr_models import (
     PDFLLMOCRRequest, PDFLLMOCRResult, PDFPageLLMResult,
     OCRRequest, OCRLLMRequest,
     # New streaming models
-    PDFPageStreamResult, PDFStreamingStatus,
-    PDFPageLLMStreamResult, PDFLLMStreamingStatus,
+    PDFPageStreamRow, PDFPageStreamResult, PDFStreamingStatus,
+    PDFPageLLMStreamResult, PDFLLMStreamingStatus, STREAM_END,
     # Cancellation models
     TaskCancellationError
 )
@@ -894,7 +894,7 @@ class PDFOCRService:
                         processed_pages=processed_pages,
                         failed_pages=page_count - processed_pages,
                         latest_page_result=None,
-                        cumulative_results=cumulative_stream_results,
+                        cumulative_results=self._to_stream_results(cumulative_stream_results),
                         progress_percentage=100.0,
                         estimated_time_remaining=0.0,
                         processing_speed=page_count / total_processing_time if total_processing_time > 0 else 0.0,
@@ -904,7 +904,7 @@ class PDFOCRService:
                 )
                 
                 # Send sentinel to close stream
-                await progress_queue.put(None)
+                await progress_queue.put(STREAM_END)
                 
                 logger.info(
                     f"Streaming PDF processing completed: {processed_pages}/{page_count} pages successful "
@@ -931,7 +931,7 @@ class PDFOCRService:
                     progress_queue,
                     PDFStreamingStatus(
                         task_id=task_id,
-                        status="failed",
+                        status="cancelled" if isinstance(e, TaskCancellationError) else "failed",
                         current_page=0,
                         total_pages=0,
                         processed_pages=0,
@@ -947,7 +947,7 @@ class PDFOCRService:
                 )
                 
                 # Send sentinel to close stream
-                await progress_queue.put(None)
+                await progress_queue.put(STREAM_END)
                 
                 return PDFOCRResult(
                     success=False,
@@ -1050,7 +1050,7 @@ class PDFOCRService:
                 )
                 
                 # Send sentinel to close stream
-                await progress_queue.put(None)
+                await progress_queue.put(STREAM_END)
                 
                 logger.info(
                     f"Streaming PDF LLM processing completed: {processed_pages}/{page_count} pages successful "
@@ -1080,7 +1080,7 @@ class PDFOCRService:
                     progress_queue,
                     PDFLLMStreamingStatus(
                         task_id=task_id,
-                        status="failed",
+                        status="cancelled" if isinstance(e, TaskCancellationError) else "failed",
                         current_page=0,
                         total_pages=0,
                         processed_pages=0,
@@ -1096,7 +1096,7 @@ class PDFOCRService:
                 )
                 
                 # Send sentinel to close stream
-                await progress_queue.put(None)
+                await progress_queue.put(STREAM_END)
                 
                 return PDFLLMOCRResult(
                     success=False,
@@ -1121,7 +1121,7 @@ class PDFOCRService:
         task_id: str,
         progress_queue: asyncio.Queue,
         start_time: float
-    ) -> tuple[List[PDFPageResult], List[PDFPageStreamResult]]:
+    ) -> tuple[List[PDFPageResult], List[PDFPageStreamRow]]:
         """
         Process images with real-time streaming updates.
         
@@ -1144,6 +1144,9 @@ class PDFOCRService:
             contrast_level=request.contrast_level
         )
         
+        # Bind the cancellation lookup once instead of resolving it per page
+        cancellation_reasons = self._cancellation_reasons()
+        
         # Process pages one by one for streaming
         for page_num, image_path in enumerate(image_paths, 1):
             page_start_time = time.time()
@@ -1152,7 +1155,7 @@ class PDFOCRService:
                 logger.debug(f"Processing page {page_num} with streaming: {image_path}")
                 
                 # Check for task cancellation before processing each page
-                await self.check_task_cancellation(task_id)
+                self._raise_if_cancelled(cancellation_reasons, task_id)
                 
                 # Process single page with OCR (similar to sync version)
                 result = await self._process_single_image(image_path, page_num, ocr_request)
@@ -1160,8 +1163,8 @@ class PDFOCRService:
                 
                 traditional_results.append(result)
                 
-                # Create streaming result
-                stream_result = PDFPageStreamResult(
+                # Create streaming result (compact row kept for the cumulative list)
+                stream_row = PDFPageStreamRow(
                     page_number=page_num,
                     extracted_text=result.extracted_text,
                     processing_time=page_processing_time, 
@@ -1171,8 +1174,9 @@ class PDFOCRService:
                     contrast_level_used=result.contrast_level_used,
                     timestamp=datetime.now(UTC)
                 )
+                stream_result = PDFPageStreamResult.from_row(stream_row)
                 
-                streaming_results.append(stream_result)
+                streaming_results.append(stream_row)
                 
                 # Calculate progress metrics
                 processed_pages = len(streaming_results)
@@ -1192,7 +1196,8 @@ class PDFOCRService:
                         processed_pages=processed_pages,
                         failed_pages=processed_pages - sum(1 for r in streaming_results if r.success),
                         latest_page_result=stream_result,  # Type 1: Single page result
-                        cumulative_results=streaming_results.copy(),  # Type 2: All results
+                        cumulative_results=self._cumulative_snapshot(streaming_results),  # Type 2: periodic full snapshot
+                        is_snapshot=self._is_snapshot_page(streaming_results),
                         progress_percentage=(processed_pages / total_pages) * 100,
                         estimated_time_remaining=estimated_remaining,
                         processing_speed=processing_speed,
@@ -1203,6 +1208,9 @@ class PDFOCRService:
                 
                 logger.debug(f"Page {page_num} processed successfully in {page_processing_time:.2f}s")
                 
+            except TaskCancellationError:
+                # Cancellation stops the whole task rather than failing one page
+                raise
             except Exception as e:
                 page_processing_time = time.time() - page_start_time
                 logger.error(f"Page {page_num} processing failed: {str(e)}")
@@ -1221,7 +1229,7 @@ class PDFOCRService:
                 traditional_results.append(traditional_result)
                 
                 # Create failed streaming result
-                stream_result = PDFPageStreamResult(
+                stream_row = PDFPageStreamRow(
                     page_number=page_num,
                     extracted_text="",
                     processing_time=page_processing_time,
@@ -1231,8 +1239,9 @@ class PDFOCRService:
                     contrast_level_used=request.contrast_level,
                     timestamp=datetime.now(UTC)
                 )
+                stream_result = PDFPageStreamResult.from_row(stream_row)
                 
-                streaming_results.append(stream_result)
+                streaming_results.append(stream_row)
                 
                 # Send error update
                 processed_pages = len(streaming_results)
@@ -1250,7 +1259,8 @@ class PDFOCRService:
                         processed_pages=processed_pages,
                         failed_pages=processed_pages - sum(1 for r in streaming_results if r.success),
                         latest_page_result=stream_result,
-                        cumulative_results=streaming_results.copy(),
+                        cumulative_results=self._cumulative_snapshot(streaming_results),
+                        is_snapshot=self._is_snapshot_page(streaming_results),
                         progress_percentage=(processed_pages / total_pages) * 100,
                         estimated_time_remaining=None,
                         processing_speed=processing_speed,
@@ -1294,6 +1304,9 @@ class PDFOCRService:
             stream=request.stream
         )
         
+        # Bind the cancellation lookup once instead of resolving it per page
+        cancellation_reasons = self._cancellation_reasons()
+        
         # Process pages one by one for streaming
         for page_num, image_path in enumerate(image_paths, 1):
             page_start_time = time.time()
@@ -1302,7 +1315,7 @@ class PDFOCRService:
                 logger.debug(f"Processing page {page_num} with LLM streaming: {image_path}")
                 
                 # Check for task cancellation before processing each page
-                await self.check_task_cancellation(task_id)
+                self._raise_if_cancelled(cancellation_reasons, task_id)
                 
                 # Process single page with LLM
                 result = await self._process_single_image_with_llm(image_path, page_num, ocr_llm_request, task_id, progress_queue)
@@ -1346,7 +1359,8 @@ class PDFOCRService:
                         processed_pages=processed_pages,
                         failed_pages=processed_pages - sum(1 for r in streaming_results if r.success),
                         latest_page_result=stream_result,  # Type 1: Single page result
-                        cumulative_results=streaming_results.copy(),  # Type 2: All results
+                        cumulative_results=self._cumulative_snapshot(streaming_results),  # Type 2: periodic full snapshot
+                        is_snapshot=self._is_snapshot_page(streaming_results),
                         progress_percentage=(processed_pages / total_pages) * 100,
                         estimated_time_remaining=estimated_remaining,
                         processing_speed=processing_speed,
@@ -1357,6 +1371,9 @@ class PDFOCRService:
                 
                 logger.debug(f"Page {page_num} LLM processed successfully in {page_processing_time:.2f}s")
                 
+            except TaskCancellationError:
+                # Cancellation stops the whole task rather than failing one page
+                raise
             except Exception as e:
                 page_processing_time = time.time() - page_start_time
                 logger.error(f"Page {page_num} LLM processing failed: {str(e)}")
@@ -1412,7 +1429,8 @@ class PDFOCRService:
                         processed_pages=processed_pages,
                         failed_pages=processed_pages - sum(1 for r in streaming_results if r.success),
                         latest_page_result=stream_result,
-                        cumulative_results=streaming_results.copy(),
+                        cumulative_results=self._cumulative_snapshot(streaming_results),
+                        is_snapshot=self._is_snapshot_page(streaming_results),
                         progress_percentage=(processed_pages / total_pages) * 100,
                         estimated_time_remaining=None,
                         processing_speed=processing_speed,
@@ -1423,6 +1441,52 @@ class PDFOCRService:
         
         return traditional_results, streaming_results
 
+    def _cumulative_snapshot(self, streaming_results: List) -> List:
+        """
+        Return cumulative results for a per-page update.
+        
+        Per-page updates are deltas that carry only latest_page_result; every
+        PDF_STREAM_SNAPSHOT_INTERVAL pages the full list is included so that
+        re-serializing it on every page doesn't grow quadratically.
+        
+        Args:
+            streaming_results: Results processed so far
+            
+        Returns:
+            Copy of the results on snapshot pages, otherwise an empty list
+        """
+        if self._is_snapshot_page(streaming_results):
+            return self._to_stream_results(streaming_results)
+        return []
+
+    def _is_snapshot_page(self, streaming_results: List) -> bool:
+        """
+        Check whether the current per-page update carries a full snapshot.
+        
+        Args:
+            streaming_results: Results processed so far
+            
+        Returns:
+            True every PDF_STREAM_SNAPSHOT_INTERVAL pages, otherwise False
+        """
+        return len(streaming_results) % self.settings.PDF_STREAM_SNAPSHOT_INTERVAL == 0
+
+    @staticmethod
+    def _to_stream_results(streaming_results: List) -> List:
+        """
+        Convert internal compact rows to public result models for emission.
+        
+        Args:
+            streaming_results: PDFPageStreamRow rows or already-built result models
+            
+        Returns:
+            New list of result models
+        """
+        return [
+            PDFPageStreamResult.from_row(r) if isinstance(r, PDFPageStreamRow) else r
+            for r in streaming_results
+        ]
+
     async def _send_streaming_update(
         self, 
         progress_queue: asyncio.Queue, 
@@ -1459,24 +1523,46 @@ class PDFOCRService:
         except Exception as e:
             logger.error(f"Failed to send LLM streaming update: {str(e)}")
 
-    async def check_task_cancellation(self, task_id: str) -> None:
+    @staticmethod
+    def _cancellation_reasons() -> Dict[str, str]:
+        """Return the controller's task_id -> cancellation reason mapping."""
+        # Import here to avoid circular imports
+        from app.controllers.ocr_controller import ocr_controller
+        
+        return ocr_controller.cancellation_reasons
+
+    @staticmethod
+    def _raise_if_cancelled(cancellation_reasons: Dict[str, str], task_id: str) -> None:
         """
-        Check if a task has been cancelled and raise exception if so.
+        Raise if the task has a recorded cancellation reason.
         
         Args:
+            cancellation_reasons: The controller's task_id -> reason mapping
             task_id: Unique task identifier
             
         Raises:
             TaskCancellationError: If task has been cancelled
         """
-        # Import here to avoid circular imports
-        from app.controllers.ocr_controller import ocr_controller
-        
-        if ocr_controller.is_task_cancelled(task_id):
-            reason = ocr_controller.cancellation_reasons.get(task_id, "Task was cancelled")
+        reason = cancellation_reasons.get(task_id)
+        if reason is not None:
             logger.info(f"Task {task_id} cancellation detected: {reason}")
             raise TaskCancellationError(task_id, reason)
 
+    def check_task_cancellation(self, task_id: str) -> None:
+        """
+        Check if a task has been cancelled and raise exception if so.
+
+        Page loops bind the controller's cancellation_reasons once and call
+        _raise_if_cancelled directly; this is the one-off entry point.
+        
+        Args:
+            task_id: Unique task identifier
+            
+        Raises:
+            TaskCancellationError: If task has been cancelled
+        """
+        self._raise_if_cancelled(self._cancellation_reasons(), task_id)
+
 
 # Global PDF OCR service instance
 pdf_ocr_service = PDFOCRService()
\ No newline at end of file
@@ -3,6 +3,7 @@ Unified stream processor for all file types with automatic detection and routing
 """
 
 import asyncio
+import struct
 import uuid
 import time
 import tempfile
@@ -10,6 +11,8 @@ from typing import Dict, Any, Optional, AsyncGenerator, List
 from pathlib import Path
 from datetime import datetime, timezone
 
+import aiofiles
+
 # Use timezone.utc instead of UTC for backward compatibility
 UTC = timezone.utc
 
@@ -27,14 +30,105 @@ from app.services.pdf_ocr_service import pdf_ocr_service
 from app.services.ocr_llm_service import ocr_llm_service
 from app.services.url_download_service import url_download_service, URLDownloadError
 from app.models.ocr_models import (
-    OCRRequest, OCRLLMRequest, PDFOCRRequest, PDFLLMOCRRequest
+    OCRRequest, OCRLLMRequest, PDFOCRRequest, PDFLLMOCRRequest, STREAM_END
 )
+from app.utils.sse import sse_event
 from app.logger_config import get_logger
 from config.settings import get_settings
 
 logger = get_logger(__name__)
 settings = get_settings()
 
+# PNG files start with this signature followed by the IHDR chunk
+PNG_SIGNATURE = b"\x89PNG\r\n\x1a\n"
+
+# Uploads are copied to disk in chunks of this size to bound memory use
+UPLOAD_CHUNK_SIZE = 1024 * 1024  # 1MB
+
+# Pending progress updates per task; producers wait once a slow client falls behind
+STREAMING_QUEUE_MAXSIZE = 32
+
+# Longest a producer waits on a full queue before dropping the oldest update
+STREAMING_QUEUE_PUT_TIMEOUT = 5.0
+
+# Update statuses that end a stream
+TERMINAL_STATUSES = frozenset({"completed", "failed", "cancelled"})
+
+
+class StreamingQueue(asyncio.Queue):
+    """
+    Bounded progress queue that never stalls its producer indefinitely.
+    
+    While an SSE consumer is attached, a full queue backpressures put() for
+    up to STREAMING_QUEUE_PUT_TIMEOUT seconds. Without a consumer, or once the
+    timeout passes, the oldest pending update is dropped instead. Terminal
+    updates and STREAM_END are never blocked.
+    
+    PDF page frames are mostly deltas (is_snapshot=False), so dropping one
+    would lose its page for good. The queue therefore remembers every page
+    result it has seen, and after such a drop it turns the next PDF delta
+    frame into a full snapshot, letting a late consumer rebuild every page.
+    """
+    
+    def __init__(
+        self,
+        maxsize: int = STREAMING_QUEUE_MAXSIZE,
+        put_timeout: float = STREAMING_QUEUE_PUT_TIMEOUT
+    ):
+        super().__init__(maxsize=maxsize)
+        self.put_timeout = put_timeout
+        self.consumer_attached = False
+        self._page_results: Dict[int, Any] = {}
+        self._snapshot_pending = False
+    
+    @staticmethod
+    def _is_terminal(item: Any) -> bool:
+        """Check whether an item ends the stream."""
+        return item is STREAM_END or getattr(item, "status", None) in TERMINAL_STATUSES
+    
+    @staticmethod
+    def _page_result(item: Any) -> Any:
+        """Get the page result of a PDF page frame, or None for other updates."""
+        if not hasattr(item, "is_snapshot"):
+            return None
+        return item.latest_page_result
+    
+    def _with_snapshot(self, item: Any) -> Any:
+        """Turn a PDF delta frame into a full snapshot if page frames were dropped."""
+        if not self._snapshot_pending or getattr(item, "is_snapshot", True):
+            return item
+        return item.model_copy(update={
+            "cumulative_results": [self._page_results[n] for n in sorted(self._page_results)],
+            "is_snapshot": True
+        })
+    
+    def _enqueued(self, item: Any) -> None:
+        """Clear the pending snapshot once a full PDF snapshot is queued."""
+        if getattr(item, "is_snapshot", False):
+            self._snapshot_pending = False
+    
+    async def put(self, item: Any) -> None:
+        """Enqueue an update, dropping the oldest one rather than waiting forever."""
+        page_result = self._page_result(item)
+        if page_result is not None:
+            self._page_results[page_result.page_number] = page_result
+        
+        if self.full() and self.consumer_attached and not self._is_terminal(item):
+            try:
+                queued = self._with_snapshot(item)
+                await asyncio.wait_for(super().put(queued), timeout=self.put_timeout)
+                self._enqueued(queued)
+                return
+            except asyncio.TimeoutError:
+                logger.debug("Streaming consumer fell behind, dropping oldest update")
+        
+        while self.full():
+            if self._page_result(self.get_nowait()) is not None:
+                self._snapshot_pending = True
+        queued = self._with_snapshot(item)
+        self.put_nowait(queued)
+        self._enqueued(queued)
+
 
 class FileTypeDetector:
     """Handles file type detection and validation."""
@@ -62,46 +156,94 @@ class FileTypeDetector:
         FileType.DOCX: 25 * 1024 * 1024     # 25MB
     }
     
+    # Flattened lookup tables so detection is a single dict probe
+    MIME_TO_TYPE = {
+        mime: file_type
+        for file_type, mimes in SUPPORTED_MIME_TYPES.items()
+        for mime in mimes
+    }
+    
+    EXTENSION_TO_TYPE = {
+        ext: file_type
+        for file_type, extensions in SUPPORTED_EXTENSIONS.items()
+        for ext in extensions
+    }
+    
+    # Leading bytes of each supported format, checked before the client MIME
+    MAGIC_SIGNATURES = {
+        PNG_SIGNATURE: FileType.IMAGE,
+        b"\xff\xd8\xff": FileType.IMAGE,
+        b"%PDF": FileType.PDF,
+        b"PK\x03\x04": FileType.DOCX  # ZIP container, confirmed by MIME/extension
+    }
+    
+    MAGIC_PEEK_SIZE = 64
+    
     @classmethod
-    async def detect_file_type(cls, file: UploadFile) -> FileType:
-        """Detect file type from MIME type and extension."""
+    async def _read_header(cls, file: UploadFile) -> bytes:
+        """Peek at the first bytes of the upload and rewind it."""
+        if not hasattr(file, "read"):
+            return b""  # URL downloads carry no readable stream
+        try:
+            header = await file.read(cls.MAGIC_PEEK_SIZE)
+            await file.seek(0)
+        except (OSError, ValueError) as e:
+            logger.debug(f"Could not read header of {file.filename}: {e}")
+            return b""
+        return header
+    
+    @staticmethod
+    def _docx_enabled() -> bool:
+        """Check whether DOCX processing is enabled."""
         from config.settings import settings
         
+        return settings.ENABLE_DOCX_PROCESSING
+    
+    @classmethod
+    def _ensure_enabled(cls, file_type: FileType) -> FileType:
+        """Reject DOCX files when DOCX processing is disabled."""
+        if file_type == FileType.DOCX and not cls._docx_enabled():
+            logger.warning(f"🚫 DOCX file detected but DOCX processing is disabled")
+            raise HTTPException(
+                status_code=400,
+                detail="DOCX processing is currently disabled. Supported formats: images and PDFs only."
+            )
+        return file_type
+    
+    @classmethod
+    async def detect_file_type(cls, file: UploadFile) -> FileType:
+        """Detect file type from file signature, MIME type and extension."""
         logger.debug(f"Detecting file type for: {file.filename} (MIME: {file.content_type})")
         
-        # Primary: MIME type detection
-        for file_type, mime_types in cls.SUPPORTED_MIME_TYPES.items():
-            if file.content_type in mime_types:
-                # Check if DOCX processing is disabled
-                if file_type == FileType.DOCX and not settings.ENABLE_DOCX_PROCESSING:
-                    logger.warning(f"🚫 DOCX file detected but DOCX processing is disabled")
-                    raise HTTPException(
-                        status_code=400,
-                        detail="DOCX processing is currently disabled. Supported formats: images and PDFs only."
-                    )
-                logger.info(f"✅ Detected {file_type.value} from MIME type: {file.content_type}")
-                return file_type
+        mime_type = cls.MIME_TO_TYPE.get(file.content_type)
+        file_ext = Path(file.filename).suffix.lower() if file.filename else ""
+        ext_type = cls.EXTENSION_TO_TYPE.get(file_ext)
+        
+        # Primary: magic byte detection
+        header = await cls._read_header(file)
+        for signature, file_type in cls.MAGIC_SIGNATURES.items():
+            if not header.startswith(signature):
+                continue
+            if file_type == FileType.DOCX and FileType.DOCX not in (mime_type, ext_type):
+                break  # Any ZIP archive matches; let MIME/extension decide
+            logger.info(f"✅ Detected {file_type.value} from file signature")
+            return cls._ensure_enabled(file_type)
+        
+        # Fallback: MIME type detection
+        if mime_type:
+            logger.info(f"✅ Detected {mime_type.value} from MIME type: {file.content_type}")
+            return cls._ensure_enabled(mime_type)
         
         # Fallback: Extension detection
-        if file.filename:
-            file_ext = Path(file.filename).suffix.lower()
-            for file_type, extensions in cls.SUPPORTED_EXTENSIONS.items():
-                if file_ext in extensions:
-                    # Check if DOCX processing is disabled
-                    if file_type == FileType.DOCX and not settings.ENABLE_DOCX_PROCESSING:
-                        logger.warning(f"🚫 DOCX file detected but DOCX processing is disabled")
-                        raise HTTPException(
-                            status_code=400,
-                            detail="DOCX processing is currently disabled. Supported formats: images and PDFs only."
-                        )
-                    logger.info(f"✅ Detected {file_type.value} from extension: {file_ext}")
-                    return file_type
+        if ext_type:
+            logger.info(f"✅ Detected {ext_type.value} from extension: {file_ext}")
+            return cls._ensure_enabled(ext_type)
         
         # No match found
         supported_types = []
         for ft, mimes in cls.SUPPORTED_MIME_TYPES.items():
             # Skip DOCX from supported types if disabled
-            if ft == FileType.DOCX and not settings.ENABLE_DOCX_PROCESSING:
+            if ft == FileType.DOCX and not cls._docx_enabled():
                 continue
             supported_types.extend(mimes)
         
@@ -129,12 +271,25 @@ class FileTypeDetector:
 class MetadataExtractor:
     """Extracts metadata from different file types."""
     
+    @staticmethod
+    def _read_image_dimensions(file_path: Path) -> Dict[str, int]:
+        """Read image dimensions from the header without decoding pixels."""
+        # Fast path: PNG keeps width and height at a fixed offset in IHDR
+        with open(file_path, "rb") as f:
+            header = f.read(24)
+        if header[:8] == PNG_SIGNATURE and header[12:16] == b"IHDR":
+            width, height = struct.unpack_from(">II", header, 16)
+            return {"width": width, "height": height}
+        
+        with Image.open(file_path) as img:
+            return {"width": img.width, "height": img.height}
+    
     @staticmethod
     async def extract_image_metadata(file_path: Path) -> Dict[str, int]:
         """Extract image dimensions."""
         try:
-            with Image.open(file_path) as img:
-                return {"width": img.width, "height": img.height}
+            # Header parsing is blocking file I/O, keep it off the event loop
+            return await asyncio.to_thread(MetadataExtractor._read_image_dimensions, file_path)
         except Exception as e:
             logger.warning(f"Failed to extract image metadata: {e}")
             return {"width": 0, "height": 0}
@@ -174,6 +329,16 @@ class ProcessingTimeEstimator:
         FileType.DOCX: {"basic": 3.0, "llm_enhanced": 5.0}  # Includes conversion time
     }
     
+    # Fixed per-file overhead (in seconds)
+    FIXED_OVERHEAD = {
+        FileType.IMAGE: 0.0,
+        FileType.PDF: 0.0,
+        FileType.DOCX: 5.0  # DOCX -> PDF conversion overhead
+    }
+    
+    # Size factor slope: +20% per 10MB
+    SIZE_FACTOR_PER_BYTE = 0.2 / (10 * 1024 * 1024)
+    
     @classmethod
     def estimate_duration(
         cls, 
@@ -186,14 +351,10 @@ class ProcessingTimeEstimator:
         base_time = cls.BASE_TIMES[file_type][mode.value]
         
         # Size factor (larger files take slightly longer)
-        size_factor = 1.0 + (file_size / (10 * 1024 * 1024)) * 0.2  # +20% per 10MB
+        size_factor = 1.0 + file_size * cls.SIZE_FACTOR_PER_BYTE
         
-        # Page count factor
-        total_time = base_time * page_count * size_factor
-        
-        # Add overhead for DOCX conversion
-        if file_type == FileType.DOCX:
-            total_time += 5.0  # DOCX -> PDF conversion overhead
+        # Page count factor plus fixed overhead (e.g. DOCX conversion)
+        total_time = base_time * page_count * size_factor + cls.FIXED_OVERHEAD[file_type]
         
         return round(total_time, 1)
 
@@ -210,6 +371,12 @@ class UnifiedStreamProcessor:
         
         logger.info("🚀 Unified Stream Processor initialized")
     
+    def _create_streaming_queue(self, task_id: str) -> StreamingQueue:
+        """Create and register the bounded progress queue for a task."""
+        queue = StreamingQueue()
+        self.streaming_queues[task_id] = queue
+        return queue
+    
     async def process_file_stream(
         self, 
         file: Optional[UploadFile], 
@@ -238,8 +405,7 @@ class UnifiedStreamProcessor:
                 logger.info(f"🌐 Processing URL download for task {task_id}: {request.url}")
                 
                 # Create streaming queue early for URL download updates
-                streaming_queue = asyncio.Queue()
-                self.streaming_queues[task_id] = streaming_queue
+                self._create_streaming_queue(task_id)
                 
                 # Send initial download progress update
                 await self._send_progress_update(
@@ -283,8 +449,7 @@ class UnifiedStreamProcessor:
             
             # Step 4: Create streaming queue (if not already created for URL)
             if not request.url:
-                streaming_queue = asyncio.Queue()
-                self.streaming_queues[task_id] = streaming_queue
+                self._create_streaming_queue(task_id)
             
             # Step 5: Save uploaded file (if not URL download)
             if not request.url:
@@ -618,7 +783,7 @@ class UnifiedStreamProcessor:
             logger.error(f"DOCX processing failed for {task_id}: {e}")
             raise
     
-    async def get_stream_generator(self, task_id: str) -> AsyncGenerator[str, None]:
+    async def get_stream_generator(self, task_id: str) -> AsyncGenerator[bytes, None]:
         """Get streaming generator for any file type."""
         if task_id not in self.streaming_queues:
             raise HTTPException(404, f"Streaming task {task_id} not found")
@@ -626,6 +791,10 @@ class UnifiedStreamProcessor:
         queue = self.streaming_queues[task_id]
         logger.debug(f"🌊 Starting stream for task {task_id}")
         
+        # Producers only wait on a full queue while someone is draining it
+        if isinstance(queue, StreamingQueue):
+            queue.consumer_attached = True
+        
         try:
             while True:
                 try:
@@ -633,10 +802,10 @@ class UnifiedStreamProcessor:
                     update = await asyncio.wait_for(queue.get(), timeout=30.0)
                     
                     # Send SSE formatted data
-                    yield f"data: {update.model_dump_json()}\n\n"
+                    yield sse_event(update)
                     
                     # Check if processing completed
-                    if update.status in ["completed", "failed", "cancelled"]:
+                    if update.status in TERMINAL_STATUSES:
                         logger.debug(f"🏁 Stream completed for {task_id} with status: {update.status}")
                         break
                         
@@ -644,10 +813,10 @@ class UnifiedStreamProcessor:
                     # Send heartbeat
                     heartbeat = {
                         "heartbeat": True,
-                        "timestamp": datetime.now(UTC).isoformat(),
+                        "timestamp": datetime.now(UTC),
                         "task_id": task_id
                     }
-                    yield f"data: {heartbeat}\n\n"
+                    yield sse_event(heartbeat)
                     
         except Exception as e:
             logger.error(f"❌ Streaming error for {task_id}: {e}")
@@ -655,11 +824,13 @@ class UnifiedStreamProcessor:
                 "task_id": task_id,
                 "status": "failed",
                 "error_message": f"Streaming error: {e}",
-                "timestamp": datetime.now(UTC).isoformat()
+                "timestamp": datetime.now(UTC)
             }
-            yield f"data: {error_update}\n\n"
+            yield sse_event(error_update)
         finally:
             logger.debug(f"🔌 Closing stream for {task_id}")
+            if isinstance(queue, StreamingQueue):
+                queue.consumer_attached = False
             # Cleanup task resources when stream ends
             await self._cleanup_task(task_id)
     
@@ -731,10 +902,10 @@ class UnifiedStreamProcessor:
         original_ext = Path(file.filename).suffix if file.filename else ""
         file_path = upload_dir / f"{task_id}{original_ext}"
         
-        # Save file
-        with open(file_path, "wb") as buffer:
-            content = await file.read()
-            buffer.write(content)
+        # Stream file to disk chunk by chunk
+        async with aiofiles.open(file_path, "wb") as buffer:
+            while chunk := await file.read(UPLOAD_CHUNK_SIZE):
+                await buffer.write(chunk)
         
         logger.debug(f"💾 Saved file to: {file_path}")
         return file_path
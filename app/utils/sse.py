@@ -0,0 +1,15 @@
+"""
+Server-Sent Events framing shared by the streaming endpoints.
+"""
+
+from pydantic_core import to_json
+
+
+# Server-Sent Events framing, applied to pre-serialized JSON bytes
+SSE_DATA_PREFIX = b"data: "
+SSE_EVENT_SUFFIX = b"\n\n"
+
+
+def sse_event(payload: object) -> bytes:
+    """Serialize payload (model or plain data) to JSON and frame it as an SSE event."""
+    return SSE_DATA_PREFIX + to_json(payload) + SSE_EVENT_SUFFIX
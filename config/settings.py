@@ -83,6 +83,7 @@ class Settings(BaseSettings):
     PDF_DPI: int = int(os.getenv("PDF_DPI", "300"))  # For PDF to image conversion
     PDF_IMAGE_FORMAT: str = os.getenv("PDF_IMAGE_FORMAT", "PNG")
     PDF_BATCH_SIZE: int = int(os.getenv("PDF_BATCH_SIZE", "3"))  # Process images in batches
+    PDF_STREAM_SNAPSHOT_INTERVAL: int = int(os.getenv("PDF_STREAM_SNAPSHOT_INTERVAL", "50"))  # Pages between full cumulative_results snapshots
 
     # --- DOCX Processing Settings ---
     ENABLE_DOCX_PROCESSING: bool = os.getenv("ENABLE_DOCX_PROCESSING", "False").lower() in ("true", "1", "t")
@@ -17,7 +17,7 @@ import os
 project_root = Path(__file__).parent.parent
 sys.path.insert(0, str(project_root))
 
-from app.models.ocr_models import PDFOCRRequest, PDFLLMOCRRequest
+from app.models.ocr_models import PDFOCRRequest, PDFLLMOCRRequest, STREAM_END
 from app.services.pdf_ocr_service import pdf_ocr_service
 from app.controllers.ocr_controller import ocr_controller
 
@@ -88,7 +88,7 @@ async def demo_basic_streaming(test_pdf: Path):
             # Get update with timeout
             update = await asyncio.wait_for(streaming_queue.get(), timeout=2.0)
             
-            if update is None:  # End sentinel
+            if update is STREAM_END:  # End sentinel
                 break
             
             updates_count += 1
@@ -37,7 +37,6 @@ class TestCancellationAPIEndpoints:
         ocr_controller.llm_tasks.clear()
         ocr_controller.pdf_tasks.clear()
         ocr_controller.pdf_llm_tasks.clear()
-        ocr_controller.cancelled_tasks.clear()
         ocr_controller.cancellation_reasons.clear()
         ocr_controller.streaming_queues.clear()
 
@@ -317,7 +316,6 @@ class TestCancellationWorkflow:
         ocr_controller.llm_tasks.clear()
         ocr_controller.pdf_tasks.clear()
         ocr_controller.pdf_llm_tasks.clear()
-        ocr_controller.cancelled_tasks.clear()
         ocr_controller.cancellation_reasons.clear()
         ocr_controller.streaming_queues.clear()
 
@@ -467,7 +465,6 @@ class TestCancellationEdgeCases:
         # Clear any existing tasks
         from app.controllers.ocr_controller import ocr_controller
         ocr_controller.tasks.clear()
-        ocr_controller.cancelled_tasks.clear()
         ocr_controller.cancellation_reasons.clear()
 
     def test_cancel_task_twice(self, client):
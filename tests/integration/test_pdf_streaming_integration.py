@@ -9,7 +9,7 @@ import time
 from pathlib import Path
 from unittest.mock import patch, AsyncMock
 
-from app.models.ocr_models import PDFOCRRequest, PDFLLMOCRRequest
+from app.models.ocr_models import PDFOCRRequest, PDFLLMOCRRequest, STREAM_END
 from app.services.pdf_ocr_service import pdf_ocr_service
 from app.controllers.ocr_controller import ocr_controller
 
@@ -66,7 +66,7 @@ class TestPDFStreamingWithRealFile:
         updates = []
         while not streaming_queue.empty():
             update = await streaming_queue.get()
-            if update is not None:  # Skip sentinel
+            if update is not STREAM_END:  # Skip sentinel
                 updates.append(update)
         
         # Verify streaming updates structure
@@ -90,9 +90,9 @@ class TestPDFStreamingWithRealFile:
             assert update.latest_page_result is not None
             assert update.latest_page_result.page_number > 0
             
-            # Type 2: Cumulative results
+            # Type 2: Cumulative results (only populated on snapshot pages)
             assert isinstance(update.cumulative_results, list)
-            assert len(update.cumulative_results) == update.processed_pages
+            assert len(update.cumulative_results) in (0, update.processed_pages)
             
             # Verify progress metrics
             assert 0 <= update.progress_percentage <= 100
@@ -168,7 +168,7 @@ class TestPDFStreamingWithRealFile:
         updates = []
         while not streaming_queue.empty():
             update = await streaming_queue.get()
-            if update is not None:  # Skip sentinel
+            if update is not STREAM_END:  # Skip sentinel
                 updates.append(update)
         
         # Verify LLM streaming updates structure
@@ -264,7 +264,7 @@ class TestControllerStreamingIntegration:
         
         try:
             async for update in ocr_controller.stream_pdf_progress(task_id):
-                if "keepalive" in update:
+                if b"keepalive" in update:
                     timeout_count += 1
                     if timeout_count >= max_timeouts:
                         break
@@ -274,7 +274,7 @@ class TestControllerStreamingIntegration:
                 
                 # Parse update to check completion
                 try:
-                    update_data = json.loads(update.replace("data: ", "").replace("\n\n", ""))
+                    update_data = json.loads(update[len(b"data: "):-2])
                     if update_data.get("status") == "completed":
                         break
                 except (json.JSONDecodeError, KeyError):
@@ -350,7 +350,7 @@ class TestStreamingPerformanceMetrics:
         updates = []
         while not streaming_queue.empty():
             update = await streaming_queue.get()
-            if update is not None:
+            if update is not STREAM_END:
                 updates.append(update)
         
         # Check progress percentage accuracy
@@ -364,8 +364,8 @@ class TestStreamingPerformanceMetrics:
             if update.processing_speed is not None:
                 assert update.processing_speed > 0
             
-            # Check cumulative results count
-            assert len(update.cumulative_results) == i + 1
+            # Check cumulative results count (empty unless this is a snapshot page)
+            assert len(update.cumulative_results) in (0, i + 1)
         
         print(f"Performance test completed in {total_time:.2f}s")
         print(f"Tracked {len(page_updates)} page completions") 
\ No newline at end of file
@@ -7,7 +7,10 @@ import asyncio
 from pathlib import Path
 from unittest.mock import Mock, AsyncMock, patch, mock_open
 
+from datetime import datetime, timezone
+
 from app.services.docx_ocr_service import DOCXOCRService
+from app.models.ocr_models import PDFPageStreamResult, PDFStreamingStatus, STREAM_END
 from app.models.unified_models import (
     UnifiedOCRRequest, ProcessingMode, UnifiedPageResult
 )
@@ -171,6 +174,54 @@ class TestDOCXOCRService:
                 assert hasattr(update, 'task_id')
                 assert hasattr(update, 'progress_percentage')
                 assert update.task_id == task_id
+    
+    @pytest.mark.asyncio
+    async def test_translate_pdf_progress_page_counts(self):
+        """Test relayed PDF delta frames keep page counts and a full result list."""
+        def page_result(page_number):
+            return PDFPageStreamResult(
+                page_number=page_number,
+                extracted_text=f"Page {page_number}",
+                processing_time=1.0,
+                success=True,
+                threshold_used=500,
+                contrast_level_used=1.3,
+                timestamp=datetime.now(timezone.utc)
+            )
+        
+        def pdf_frame(page_number, status, progress, cumulative):
+            return PDFStreamingStatus(
+                is_snapshot=bool(cumulative),
+                task_id="relay-task",
+                status=status,
+                current_page=page_number,
+                total_pages=3,
+                processed_pages=page_number,
+                latest_page_result=page_result(page_number),
+                cumulative_results=cumulative,
+                progress_percentage=progress,
+                timestamp=datetime.now(timezone.utc)
+            )
+        
+        pdf_queue = asyncio.Queue()
+        unified_queue = asyncio.Queue()
+        for frame in (
+            pdf_frame(1, "page_completed", 33.3, []),
+            pdf_frame(2, "page_completed", 66.6, []),
+            pdf_frame(3, "completed", 100.0, [page_result(n) for n in (1, 2, 3)]),
+            STREAM_END
+        ):
+            pdf_queue.put_nowait(frame)
+        
+        await self.service._translate_pdf_progress(
+            pdf_queue, unified_queue, "relay-task", ProcessingMode.BASIC
+        )
+        
+        updates = [unified_queue.get_nowait() for _ in range(unified_queue.qsize())]
+        assert [(u.processed_pages, u.total_pages) for u in updates] == [(1, 3), (2, 3), (3, 3)]
+        assert [len(u.cumulative_results) for u in updates] == [1, 2, 3]
+        assert [r.page_number for r in updates[-1].cumulative_results] == [1, 2, 3]
+        assert updates[-1].status == "completed"
 
 
 class TestDOCXServiceIntegration:
@@ -183,7 +183,7 @@ class TestOCRController:
             file_path = await ocr_controller._save_uploaded_file(mock_upload_file, "test-task-id")
             
             assert isinstance(file_path, Path)
-            assert "test-task-id" in str(file_path)
+            assert file_path.name == "test-task-id.jpg"
             mock_mkdir.assert_called_once()
             mock_open.assert_called_once()
     
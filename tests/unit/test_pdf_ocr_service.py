@@ -48,28 +48,24 @@ class TestPDFOCRService:
         """Create mock PDF path."""
         return Path("/tmp/test.pdf")
     
-    @pytest.mark.asyncio
-    async def test_check_task_cancellation_not_cancelled(self, pdf_service):
+    def test_check_task_cancellation_not_cancelled(self, pdf_service):
         """Test check_task_cancellation when task is not cancelled."""
         task_id = "test-task-123"
         
         # Should not raise exception when task is not cancelled
-        await pdf_service.check_task_cancellation(task_id)
+        pdf_service.check_task_cancellation(task_id)
     
-    @pytest.mark.asyncio
-    async def test_check_task_cancellation_cancelled(self, pdf_service):
+    def test_check_task_cancellation_cancelled(self, pdf_service):
         """Test check_task_cancellation when task is cancelled."""
         from app.controllers.ocr_controller import ocr_controller
         
         task_id = "test-task-123"
-        ocr_controller.cancelled_tasks.add(task_id)
         ocr_controller.cancellation_reasons[task_id] = "Test cancellation"
         
         with pytest.raises(Exception, match="Task test-task-123 was cancelled"):
-            await pdf_service.check_task_cancellation(task_id)
+            pdf_service.check_task_cancellation(task_id)
         
         # Cleanup
-        ocr_controller.cancelled_tasks.discard(task_id)
         ocr_controller.cancellation_reasons.pop(task_id, None)
     
     def test_pdf_ocr_service_cancellation_integration(self, pdf_service):
@@ -82,15 +78,13 @@ class TestPDFOCRService:
         # Initially task should not be cancelled
         assert not ocr_controller.is_task_cancelled(task_id)
         
-        # Add task to cancelled set
-        ocr_controller.cancelled_tasks.add(task_id)
+        # Record a cancellation reason for the task
         ocr_controller.cancellation_reasons[task_id] = "Test integration"
         
         # Now task should be cancelled
         assert ocr_controller.is_task_cancelled(task_id)
         
         # Cleanup
-        ocr_controller.cancelled_tasks.discard(task_id)
         ocr_controller.cancellation_reasons.pop(task_id, None)
     
     def test_pdf_ocr_service_initialization(self, pdf_service):
@@ -103,7 +97,7 @@ class TestPDFOCRService:
         """Test that PDF OCR service has cancellation check method."""
         import inspect
         assert hasattr(pdf_service, 'check_task_cancellation')
-        assert inspect.iscoroutinefunction(pdf_service.check_task_cancellation)
+        assert not inspect.iscoroutinefunction(pdf_service.check_task_cancellation)
     
     # --- Page Selection Tests ---
     
@@ -4,21 +4,20 @@ Unit tests for PDF streaming functionality.
 
 import asyncio
 import json
+import sys
 import pytest
 from datetime import datetime, UTC
 from pathlib import Path
-from unittest.mock import AsyncMock, MagicMock, patch
-from typing import List
+from unittest.mock import MagicMock, patch
 
 from app.models.ocr_models import (
-    PDFOCRRequest, PDFOCRResult, PDFPageResult,
-    PDFLLMOCRRequest, PDFLLMOCRResult, PDFPageLLMResult,
-    PDFPageStreamResult, PDFStreamingStatus,
+    PDFOCRRequest, PDFPageResult,
+    PDFPageStreamRow, PDFPageStreamResult, PDFStreamingStatus,
     PDFPageLLMStreamResult, PDFLLMStreamingStatus,
-    OCRResult
+    STREAM_END
 )
-from app.services.pdf_ocr_service import PDFOCRService
-from app.controllers.ocr_controller import OCRController
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
 class TestPDFStreamingModels:
@@ -46,6 +45,97 @@ class TestPDFStreamingModels:
         assert result.contrast_level_used == 1.3
         assert isinstance(result.timestamp, datetime)
     
+    def test_pdf_page_stream_result_from_row(self):
+        """Test building PDFPageStreamResult from a compact row."""
+        row = PDFPageStreamRow(
+            page_number=1,
+            extracted_text="Test text",
+            processing_time=2.5,
+            success=True,
+            error_message=None,
+            threshold_used=500,
+            contrast_level_used=1.3,
+            timestamp=datetime.now(UTC)
+        )
+        
+        result = PDFPageStreamResult.from_row(row)
+        
+        assert result == PDFPageStreamResult(
+            page_number=1,
+            extracted_text="Test text",
+            processing_time=2.5,
+            success=True,
+            error_message=None,
+            threshold_used=500,
+            contrast_level_used=1.3,
+            timestamp=row.timestamp
+        )
+    
+    def test_model_construct_skips_validation(self):
+        """Test that the trusted construction path does not validate values."""
+        result = PDFPageStreamResult.model_construct(
+            page_number=1,
+            extracted_text="Test text",
+            processing_time="not a float",
+            success=True,
+            error_message=None,
+            threshold_used=500,
+            contrast_level_used=1.3,
+            timestamp=datetime.now(UTC)
+        )
+        
+        # Invalid values pass through untouched; only use for in-process data
+        assert result.processing_time == "not a float"
+    
+    def test_pdf_page_stream_row_is_smaller_than_model(self):
+        """Test that the compact row uses less memory than the Pydantic model."""
+        row = PDFPageStreamRow(
+            page_number=1,
+            extracted_text="Test text",
+            processing_time=2.5,
+            success=True,
+            error_message=None,
+            threshold_used=500,
+            contrast_level_used=1.3,
+            timestamp=datetime.now(UTC)
+        )
+        result = PDFPageStreamResult.from_row(row)
+        
+        assert not hasattr(row, "__dict__")
+        assert sys.getsizeof(row) < sys.getsizeof(result) + sys.getsizeof(result.__dict__)
+    
+    def test_cumulative_snapshot_converts_rows(self):
+        """Test that compact rows are converted to result models before emission."""
+        from app.services.pdf_ocr_service import PDFOCRService
+        
+        row = PDFPageStreamRow(
+            page_number=1,
+            extracted_text="Test text",
+            processing_time=2.5,
+            success=True,
+            error_message=None,
+            threshold_used=500,
+            contrast_level_used=1.3,
+            timestamp=datetime.now(UTC)
+        )
+        
+        results = PDFOCRService._to_stream_results([row])
+        status = PDFStreamingStatus(
+            task_id="test-task-123",
+            status="page_completed",
+            current_page=1,
+            total_pages=1,
+            processed_pages=1,
+            latest_page_result=PDFPageStreamResult.from_row(row),
+            cumulative_results=results,
+            progress_percentage=100.0,
+            timestamp=datetime.now(UTC)
+        )
+        
+        assert all(isinstance(r, PDFPageStreamResult) for r in status.cumulative_results)
+        data = json.loads(status.model_dump_json())
+        assert data["cumulative_results"] == [data["latest_page_result"]]
+    
     def test_pdf_streaming_status_creation(self):
         """Test PDFStreamingStatus model creation."""
         page_result = PDFPageStreamResult(
@@ -123,9 +213,10 @@ class TestPDFStreamingModels:
 class TestPDFOCRServiceStreaming:
     """Test PDF OCR service streaming functionality."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def pdf_service(self):
-        """Create PDF OCR service instance."""
+        """Create PDF OCR service instance shared by the module."""
+        from app.services.pdf_ocr_service import PDFOCRService
         return PDFOCRService()
     
     @pytest.fixture
@@ -140,7 +231,6 @@ class TestPDFOCRServiceStreaming:
         """Create streaming queue."""
         return asyncio.Queue()
     
-    @pytest.mark.asyncio
     async def test_send_streaming_update(self, pdf_service, streaming_queue):
         """Test sending streaming updates."""
         status = PDFStreamingStatus(
@@ -159,11 +249,10 @@ class TestPDFOCRServiceStreaming:
         
         # Check that update was sent
         assert streaming_queue.qsize() == 1
-        received_status = await streaming_queue.get()
+        received_status = streaming_queue.get_nowait()
         assert received_status.task_id == "test-123"
         assert received_status.status == "processing"
     
-    @pytest.mark.asyncio
     async def test_send_llm_streaming_update(self, pdf_service, streaming_queue):
         """Test sending LLM streaming updates."""
         status = PDFLLMStreamingStatus(
@@ -182,18 +271,59 @@ class TestPDFOCRServiceStreaming:
         
         # Check that update was sent
         assert streaming_queue.qsize() == 1
-        received_status = await streaming_queue.get()
+        received_status = streaming_queue.get_nowait()
         assert received_status.task_id == "test-llm-123"
         assert received_status.status == "processing"
+    
+    async def test_snapshot_every_n_pages(self, pdf_service, streaming_queue):
+        """Test that page updates are deltas with periodic full snapshots."""
+        interval = pdf_service.settings.PDF_STREAM_SNAPSHOT_INTERVAL
+        total_pages = interval + 1
+        image_paths = [Path(f"/tmp/page_{i}.png") for i in range(1, total_pages + 1)]
+        request = PDFOCRRequest(threshold=500, contrast_level=1.3)
+        
+        async def fake_process_single_image(image_path, page_num, ocr_request):
+            return PDFPageResult(
+                page_number=page_num,
+                extracted_text=f"Page {page_num}",
+                processing_time=0.01,
+                success=True,
+                threshold_used=500,
+                contrast_level_used=1.3
+            )
+        
+        with patch.object(pdf_service, "_process_single_image", side_effect=fake_process_single_image):
+            _, streaming_results = await pdf_service._process_images_with_streaming(
+                image_paths, request, "test-snapshot-123", streaming_queue, 0.0
+            )
+        
+        updates = [streaming_queue.get_nowait() for _ in range(streaming_queue.qsize())]
+        snapshots = [u for u in updates if u.is_snapshot]
+        
+        assert len(updates) == total_pages
+        assert len(streaming_results) == total_pages
+        assert all(u.latest_page_result is not None for u in updates)
+        assert len(snapshots) == 1
+        assert snapshots[0].current_page == interval
+        assert len(snapshots[0].cumulative_results) == interval
+        assert all(isinstance(r, PDFPageStreamResult) for r in snapshots[0].cumulative_results)
+        assert all(u.cumulative_results == [] for u in updates if not u.is_snapshot)
 
 
 class TestOCRControllerStreaming:
     """Test OCR controller streaming functionality."""
     
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def controller(self):
-        """Create OCR controller instance."""
+        """Create OCR controller instance shared by the module."""
+        from app.controllers.ocr_controller import OCRController
         return OCRController()
+
+    @pytest.fixture(autouse=True)
+    def _reset(self, controller):
+        """Reset controller state so each test starts clean."""
+        controller.reset_state()
+        yield
     
     @pytest.fixture
     def mock_upload_file(self):
@@ -204,7 +334,6 @@ class TestOCRControllerStreaming:
         mock_file.size = 1024
         return mock_file
     
-    @pytest.mark.asyncio
     async def test_stream_pdf_progress_task_not_found(self, controller):
         """Test streaming progress for non-existent task."""
         task_id = "non-existent-task"
@@ -216,9 +345,9 @@ class TestOCRControllerStreaming:
             break  # Just get the first response
         
         assert len(responses) == 1
-        assert "Task not found" in responses[0]
+        assert b"Task not found" in responses[0]
+        assert responses[0] == b'data: {"error":"Task not found"}\n\n'
     
-    @pytest.mark.asyncio
     async def test_stream_pdf_progress_with_updates(self, controller):
         """Test streaming progress with actual updates."""
         task_id = "test-stream-123"
@@ -241,7 +370,7 @@ class TestOCRControllerStreaming:
         )
         
         await queue.put(test_status)
-        await queue.put(None)  # Sentinel to end stream
+        await queue.put(STREAM_END)  # Sentinel to end stream
         
         # Collect streaming responses
         responses = []
@@ -250,7 +379,8 @@ class TestOCRControllerStreaming:
         
         # Verify responses
         assert len(responses) == 1
-        response_data = json.loads(responses[0].replace("data: ", "").replace("\n\n", ""))
+        assert responses[0].startswith(b"data: ") and responses[0].endswith(b"\n\n")
+        response_data = json.loads(responses[0][len(b"data: "):-2])
         assert response_data["task_id"] == task_id
         assert response_data["status"] == "page_completed"
         assert response_data["progress_percentage"] == 50.0
@@ -262,9 +392,9 @@ class TestOCRControllerStreaming:
 class TestStreamingErrorHandling:
     """Test error handling in streaming functionality."""
     
-    @pytest.mark.asyncio
     async def test_streaming_queue_error_handling(self):
         """Test handling of streaming queue errors."""
+        from app.services.pdf_ocr_service import PDFOCRService
         service = PDFOCRService()
         
         # Test with None queue (should not raise exception)
@@ -277,9 +407,9 @@ class TestStreamingErrorHandling:
         except Exception:
             pass  # Should handle gracefully
     
-    @pytest.mark.asyncio
     async def test_controller_streaming_queue_cleanup(self):
         """Test that streaming queues are properly cleaned up."""
+        from app.controllers.ocr_controller import OCRController
         controller = OCRController()
         task_id = "cleanup-test-123"
         
@@ -288,7 +418,7 @@ class TestStreamingErrorHandling:
         controller.streaming_queues[task_id] = queue
         
         # Simulate stream completion
-        await queue.put(None)  # Sentinel
+        await queue.put(STREAM_END)  # Sentinel
         
         # Stream should clean up queue
         responses = []
@@ -4,29 +4,45 @@ Unit tests for task cancellation functionality.
 
 import asyncio
 import pytest
+from dataclasses import dataclass, field
 from datetime import datetime, UTC
-from unittest.mock import AsyncMock, MagicMock, patch
+from typing import Dict
+from unittest.mock import AsyncMock, patch
 from pathlib import Path
 from fastapi import HTTPException
 
 from app.models.ocr_models import (
-    OCRRequest, OCRResponse, OCRResult,
-    OCRLLMRequest, OCRLLMResponse, OCRLLMResult,
-    PDFOCRRequest, PDFOCRResponse, PDFOCRResult,
-    PDFLLMOCRRequest, PDFLLMOCRResponse, PDFLLMOCRResult,
-    CancelTaskRequest, CancelTaskResponse, TaskCancellationError, TaskStatus
+    OCRResponse, OCRLLMResponse,
+    PDFOCRRequest, PDFOCRResponse, PDFLLMOCRResponse,
+    CancelTaskRequest, CancelTaskResponse, TaskCancellationError, TaskStatus,
+    DEFAULT_CANCELLATION_REASON
 )
 from app.controllers.ocr_controller import OCRController
 
+pytestmark = pytest.mark.asyncio(loop_scope="session")
+
 
 class TestTaskCancellation:
     """Test suite for task cancellation functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def controller(self):
-        """Create a fresh OCR controller for each test."""
+        """Create a single OCR controller shared by the module."""
         return OCRController()
 
+    @pytest.fixture(autouse=True)
+    def _reset(self, controller):
+        """Reset controller state so each test starts clean."""
+        controller.reset_state()
+        yield
+
+    @pytest.fixture
+    def frozen_now(self, monkeypatch):
+        """Freeze the controller clock and return the fixed timestamp."""
+        ts = datetime(2024, 1, 1, tzinfo=UTC)
+        monkeypatch.setattr('app.controllers.ocr_controller._now', lambda: ts)
+        return ts
+
     @pytest.fixture
     def mock_task_id(self):
         """Return a mock task ID."""
@@ -39,17 +55,15 @@ class TestTaskCancellation:
 
     # --- OCR Task Cancellation Tests ---
 
-    @pytest.mark.asyncio
-    async def test_cancel_ocr_task_success(self, controller, mock_task_id, cancel_request):
+    async def test_cancel_ocr_task_success(self, controller, mock_task_id, cancel_request, frozen_now):
         """Test successful OCR task cancellation."""
         # Create a task
-        created_at = datetime.now(UTC)
         task = OCRResponse(
             task_id=mock_task_id,
             status="processing",
             result=None,
             error_message=None,
-            created_at=created_at,
+            created_at=frozen_now,
             completed_at=None
         )
         controller.tasks[mock_task_id] = task
@@ -62,15 +76,15 @@ class TestTaskCancellation:
         assert result.status == TaskStatus.CANCELLED
         assert result.message == "OCR task successfully cancelled"
         assert result.cancellation_reason == cancel_request.reason
-        assert result.cancelled_at is not None
+        assert result.cancelled_at == frozen_now
 
         # Verify task is marked as cancelled
         assert controller.is_task_cancelled(mock_task_id)
         assert task.status == TaskStatus.CANCELLED
         assert task.cancellation_reason == cancel_request.reason
-        assert task.cancelled_at is not None
+        assert task.cancelled_at == frozen_now
+        assert task.completed_at == frozen_now
 
-    @pytest.mark.asyncio
     async def test_cancel_ocr_task_not_found(self, controller, cancel_request):
         """Test cancelling non-existent OCR task."""
         with pytest.raises(HTTPException) as exc_info:
@@ -79,7 +93,6 @@ class TestTaskCancellation:
         assert exc_info.value.status_code == 404
         assert "not found" in str(exc_info.value.detail)
 
-    @pytest.mark.asyncio
     async def test_cancel_ocr_task_already_completed(self, controller, mock_task_id, cancel_request):
         """Test cancelling already completed OCR task."""
         # Create a completed task
@@ -102,8 +115,7 @@ class TestTaskCancellation:
 
     # --- PDF Task Cancellation Tests ---
 
-    @pytest.mark.asyncio
-    async def test_cancel_pdf_task_success(self, controller, mock_task_id, cancel_request):
+    async def test_cancel_pdf_task_success(self, controller, mock_task_id, cancel_request, frozen_now):
         """Test successful PDF task cancellation."""
         # Create a PDF task
         task = PDFOCRResponse(
@@ -111,7 +123,7 @@ class TestTaskCancellation:
             status="processing",
             result=None,
             error_message=None,
-            created_at=datetime.now(UTC),
+            created_at=frozen_now,
             completed_at=None
         )
         controller.pdf_tasks[mock_task_id] = task
@@ -127,13 +139,13 @@ class TestTaskCancellation:
         assert result.status == TaskStatus.CANCELLED
         assert result.message == "PDF task successfully cancelled"
         assert result.cancellation_reason == cancel_request.reason
+        assert result.cancelled_at == frozen_now
 
         # Verify task is marked as cancelled
         assert controller.is_task_cancelled(mock_task_id)
         assert task.status == TaskStatus.CANCELLED
 
-    @pytest.mark.asyncio
-    async def test_cancel_pdf_llm_task_success(self, controller, mock_task_id, cancel_request):
+    async def test_cancel_pdf_llm_task_success(self, controller, mock_task_id, cancel_request, frozen_now):
         """Test successful PDF LLM task cancellation."""
         # Create a PDF LLM task
         task = PDFLLMOCRResponse(
@@ -141,7 +153,7 @@ class TestTaskCancellation:
             status="processing",
             result=None,
             error_message=None,
-            created_at=datetime.now(UTC),
+            created_at=frozen_now,
             completed_at=None
         )
         controller.pdf_llm_tasks[mock_task_id] = task
@@ -153,11 +165,11 @@ class TestTaskCancellation:
         assert result.task_id == mock_task_id
         assert result.status == TaskStatus.CANCELLED
         assert result.message == "PDF LLM task successfully cancelled"
+        assert result.cancelled_at == frozen_now
 
     # --- LLM Task Cancellation Tests ---
 
-    @pytest.mark.asyncio
-    async def test_cancel_llm_task_success(self, controller, mock_task_id, cancel_request):
+    async def test_cancel_llm_task_success(self, controller, mock_task_id, cancel_request, frozen_now):
         """Test successful LLM task cancellation."""
         # Create a LLM task
         task = OCRLLMResponse(
@@ -165,7 +177,7 @@ class TestTaskCancellation:
             status="processing",
             result=None,
             error_message=None,
-            created_at=datetime.now(UTC),
+            created_at=frozen_now,
             completed_at=None
         )
         controller.llm_tasks[mock_task_id] = task
@@ -177,10 +189,10 @@ class TestTaskCancellation:
         assert result.task_id == mock_task_id
         assert result.status == TaskStatus.CANCELLED
         assert result.message == "LLM task successfully cancelled"
+        assert result.cancelled_at == frozen_now
 
     # --- Streaming Task Cancellation Tests ---
 
-    @pytest.mark.asyncio
     async def test_cancel_streaming_task_pdf(self, controller, mock_task_id, cancel_request):
         """Test cancelling streaming PDF task."""
         # Create a streaming PDF task
@@ -201,7 +213,6 @@ class TestTaskCancellation:
         assert result.task_id == mock_task_id
         assert result.status == TaskStatus.CANCELLED
 
-    @pytest.mark.asyncio
     async def test_cancel_streaming_task_not_found(self, controller, cancel_request):
         """Test cancelling non-existent streaming task."""
         with pytest.raises(HTTPException) as exc_info:
@@ -214,7 +225,7 @@ class TestTaskCancellation:
 
     def test_is_task_cancelled_true(self, controller, mock_task_id):
         """Test checking if task is cancelled (true case)."""
-        controller.cancelled_tasks.add(mock_task_id)
+        controller.cancellation_reasons[mock_task_id] = "test"
         
         assert controller.is_task_cancelled(mock_task_id) is True
 
@@ -237,63 +248,63 @@ class TestTaskCancellation:
         assert reason in str(error)
 
 
+@dataclass
+class _FakeController:
+    """Minimal stand-in for OCRController's cancellation tracking."""
+    cancellation_reasons: Dict[str, str] = field(default_factory=dict)
+
+    def is_task_cancelled(self, task_id: str) -> bool:
+        return task_id in self.cancellation_reasons
+
+
 class TestPDFServiceCancellation:
     """Test suite for PDF service cancellation functionality."""
 
-    @pytest.fixture
+    @pytest.fixture(scope="module")
     def pdf_service(self):
-        """Create a PDF service instance."""
+        """Create a PDF service instance shared by the module."""
         from app.services.pdf_ocr_service import PDFOCRService
         return PDFOCRService()
 
     @pytest.fixture
-    def mock_controller(self):
-        """Create a mock controller."""
-        controller = MagicMock()
-        controller.is_task_cancelled.return_value = False
-        controller.cancellation_reasons = {}
+    def fake_controller(self, monkeypatch):
+        """Install a lightweight controller stub in place of the global controller."""
+        controller = _FakeController()
+        monkeypatch.setattr('app.controllers.ocr_controller.ocr_controller', controller)
         return controller
 
-    @pytest.mark.asyncio
-    async def test_check_task_cancellation_not_cancelled(self, pdf_service):
+    def test_check_task_cancellation_not_cancelled(self, pdf_service, fake_controller):
         """Test cancellation check when task is not cancelled."""
-        with patch('app.controllers.ocr_controller.ocr_controller') as mock_controller:
-            mock_controller.is_task_cancelled.return_value = False
-            
-            # Should not raise exception
-            await pdf_service.check_task_cancellation("test-task")
-
-    @pytest.mark.asyncio
-    async def test_check_task_cancellation_cancelled(self, pdf_service):
+        # Should not raise exception
+        pdf_service.check_task_cancellation("test-task")
+
+    def test_check_task_cancellation_cancelled(self, pdf_service, fake_controller):
         """Test cancellation check when task is cancelled."""
-        with patch('app.controllers.ocr_controller.ocr_controller') as mock_controller:
-            mock_controller.is_task_cancelled.return_value = True
-            mock_controller.cancellation_reasons = {"test-task": "User requested"}
-            
-            # Should raise TaskCancellationError
+        fake_controller.cancellation_reasons["test-task"] = "User requested"
+        
+        # Should raise TaskCancellationError
+        with pytest.raises(TaskCancellationError) as exc_info:
+            pdf_service.check_task_cancellation("test-task")
+        
+        assert exc_info.value.task_id == "test-task"
+        assert exc_info.value.reason == "User requested"
+
+    async def test_streaming_processing_with_cancellation(self, pdf_service, fake_controller):
+        """Test that the streaming page loop stops with the cancellation reason."""
+        fake_controller.cancellation_reasons["test-task"] = "Cancelled during processing"
+        queue = asyncio.Queue()
+        request = PDFOCRRequest(threshold=500, contrast_level=1.3)
+        
+        with patch.object(pdf_service, '_process_single_image', new_callable=AsyncMock) as mock_process:
             with pytest.raises(TaskCancellationError) as exc_info:
-                await pdf_service.check_task_cancellation("test-task")
-            
-            assert exc_info.value.task_id == "test-task"
-            assert exc_info.value.reason == "User requested"
-
-    @pytest.mark.asyncio
-    async def test_streaming_processing_with_cancellation(self, pdf_service):
-        """Test that streaming processing checks for cancellation."""
-        # This is more of an integration test, but we can test the logic
-        with patch('app.controllers.ocr_controller.ocr_controller') as mock_controller:
-            mock_controller.is_task_cancelled.return_value = True
-            mock_controller.cancellation_reasons = {"test-task": "Cancelled during processing"}
-            
-            # Mock the processing method to verify cancellation check is called
-            with patch.object(pdf_service, 'check_task_cancellation') as mock_check:
-                mock_check.side_effect = TaskCancellationError("test-task", "Cancelled")
-                
-                # This would be called during streaming processing
-                with pytest.raises(TaskCancellationError):
-                    await pdf_service.check_task_cancellation("test-task")
-                
-                mock_check.assert_called_once_with("test-task")
+                await pdf_service._process_images_with_streaming(
+                    [Path("/tmp/page_1.png"), Path("/tmp/page_2.png")], request, "test-task", queue, 0.0
+                )
+        
+        mock_process.assert_not_called()
+        assert exc_info.value.task_id == "test-task"
+        assert exc_info.value.reason == "Cancelled during processing"
+        assert queue.empty()
 
 
 class TestTaskStatusEnums:
@@ -301,12 +312,16 @@ class TestTaskStatusEnums:
 
     def test_task_status_values(self):
         """Test that all required task statuses are available."""
-        assert TaskStatus.PENDING == "pending"
-        assert TaskStatus.PROCESSING == "processing"
-        assert TaskStatus.PAGE_COMPLETED == "page_completed"
-        assert TaskStatus.COMPLETED == "completed"
-        assert TaskStatus.FAILED == "failed"
-        assert TaskStatus.CANCELLED == "cancelled"
+        expected = {
+            "PENDING": "pending",
+            "PROCESSING": "processing",
+            "PAGE_COMPLETED": "page_completed",
+            "COMPLETED": "completed",
+            "FAILED": "failed",
+            "CANCELLED": "cancelled",
+        }
+        
+        assert {status.name: status.value for status in TaskStatus} == expected
 
     def test_task_status_is_string_enum(self):
         """Test that TaskStatus extends str enum."""
@@ -323,6 +338,11 @@ class TestCancellationModels:
         
         assert request.reason == "User requested cancellation"
 
+    def test_default_reason_interned(self):
+        """Test that the default reason is the shared interned constant."""
+        assert CancelTaskRequest().reason is DEFAULT_CANCELLATION_REASON
+        assert OCRController.cancel_ocr_task.__defaults__ == (DEFAULT_CANCELLATION_REASON,)
+
     def test_cancel_task_request_custom(self):
         """Test CancelTaskRequest with custom reason."""
         custom_reason = "Processing taking too long"
@@ -6,6 +6,8 @@ import pytest
 from datetime import datetime, timezone
 from typing import Dict, Any
 
+from pydantic import TypeAdapter
+
 from app.models.unified_models import (
     FileType, ProcessingMode, ProcessingStep,
     UnifiedOCRRequest, UnifiedOCRResponse, 
@@ -15,36 +17,79 @@ from app.models.unified_models import (
 )
 
 UTC = timezone.utc
+FIXED_TS = datetime(2024, 1, 1, 12, 0, 0, tzinfo=UTC)
+_DEFAULT_DIMS = {"width": 1920, "height": 1080}
 
 
-def test_file_type_enum():
-    """Test FileType enum values."""
-    assert FileType.IMAGE == "image"
-    assert FileType.PDF == "pdf"
-    assert FileType.DOCX == "docx"
+_EXPECTED_STEPS = frozenset({
+    "upload", "validation", "conversion", "image_extraction",
+    "ocr_processing", "llm_enhancement", "completed", "failed", "cancelled"
+})
+_ACTUAL_STEPS = frozenset(ps.value for ps in ProcessingStep)
 
 
-def test_processing_mode_enum():
-    """Test ProcessingMode enum values."""
-    assert ProcessingMode.BASIC == "basic"
-    assert ProcessingMode.LLM_ENHANCED == "llm_enhanced"
+@pytest.mark.parametrize("enum_member,expected", [
+    (FileType.IMAGE, "image"),
+    (FileType.PDF, "pdf"),
+    (FileType.DOCX, "docx"),
+    (ProcessingMode.BASIC, "basic"),
+    (ProcessingMode.LLM_ENHANCED, "llm_enhanced"),
+])
+def test_enum_values(enum_member, expected):
+    """Test FileType and ProcessingMode enum values."""
+    assert enum_member == expected
 
 
 def test_processing_step_enum():
     """Test ProcessingStep enum values."""
-    expected_steps = [
-        "upload", "validation", "conversion", "image_extraction",
-        "ocr_processing", "llm_enhancement", "completed", "failed", "cancelled"
-    ]
-    
-    actual_steps = [ps.value for ps in ProcessingStep]
-    for step in expected_steps:
-        assert step in actual_steps
+    assert _EXPECTED_STEPS <= _ACTUAL_STEPS
+
+
+@pytest.fixture(scope="module")
+def default_request():
+    """Default UnifiedOCRRequest shared by read-only tests."""
+    return UnifiedOCRRequest()
+
+
+@pytest.fixture(scope="module")
+def image_metadata():
+    """Image FileMetadata shared by read-only tests."""
+    return FileMetadata(
+        original_filename="test.jpg",
+        file_size_bytes=1024000,
+        mime_type="image/jpeg",
+        detected_file_type=FileType.IMAGE,
+        image_dimensions=_DEFAULT_DIMS
+    )
+
+
+@pytest.fixture(scope="module")
+def pdf_metadata():
+    """PDF FileMetadata shared by read-only tests."""
+    return FileMetadata(
+        original_filename="document.pdf",
+        file_size_bytes=5000000,
+        mime_type="application/pdf",
+        detected_file_type=FileType.PDF,
+        pdf_page_count=10
+    )
+
+
+@pytest.fixture(scope="module")
+def docx_metadata():
+    """DOCX FileMetadata shared by read-only tests."""
+    return FileMetadata(
+        original_filename="report.docx",
+        file_size_bytes=2500000,
+        mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
+        detected_file_type=FileType.DOCX,
+        docx_page_count=15
+    )
 
 
-def test_unified_ocr_request_defaults():
+def test_unified_ocr_request_defaults(default_request):
     """Test UnifiedOCRRequest default values."""
-    request = UnifiedOCRRequest()
+    request = default_request
     
     assert request.threshold == 500
     assert request.contrast_level == 1.3
@@ -73,34 +118,22 @@ def test_unified_ocr_request_custom():
     assert request.mode == ProcessingMode.LLM_ENHANCED
 
 
-def test_file_metadata():
+def test_file_metadata(image_metadata):
     """Test FileMetadata model."""
-    metadata = FileMetadata(
-        original_filename="test.jpg",
-        file_size_bytes=1024000,
-        mime_type="image/jpeg",
-        detected_file_type=FileType.IMAGE,
-        image_dimensions={"width": 1920, "height": 1080}
-    )
+    metadata = image_metadata
     
     assert metadata.original_filename == "test.jpg"
     assert metadata.file_size_bytes == 1024000
     assert metadata.mime_type == "image/jpeg"
     assert metadata.detected_file_type == FileType.IMAGE
-    assert metadata.image_dimensions == {"width": 1920, "height": 1080}
+    assert metadata.image_dimensions == _DEFAULT_DIMS
     assert metadata.pdf_page_count is None
     assert metadata.docx_page_count is None
 
 
-def test_pdf_metadata():
+def test_pdf_metadata(pdf_metadata):
     """Test PDF file metadata."""
-    metadata = FileMetadata(
-        original_filename="document.pdf",
-        file_size_bytes=5000000,
-        mime_type="application/pdf",
-        detected_file_type=FileType.PDF,
-        pdf_page_count=10
-    )
+    metadata = pdf_metadata
     
     assert metadata.original_filename == "document.pdf"
     assert metadata.detected_file_type == FileType.PDF
@@ -109,15 +142,9 @@ def test_pdf_metadata():
     assert metadata.docx_page_count is None
 
 
-def test_docx_metadata():
+def test_docx_metadata(docx_metadata):
     """Test DOCX file metadata."""
-    metadata = FileMetadata(
-        original_filename="report.docx",
-        file_size_bytes=2500000,
-        mime_type="application/vnd.openxmlformats-officedocument.wordprocessingml.document",
-        detected_file_type=FileType.DOCX,
-        docx_page_count=15
-    )
+    metadata = docx_metadata
     
     assert metadata.original_filename == "report.docx"
     assert metadata.detected_file_type == FileType.DOCX
@@ -128,7 +155,7 @@ def test_docx_metadata():
 
 def test_unified_page_result():
     """Test UnifiedPageResult model."""
-    timestamp = datetime.now(UTC)
+    timestamp = FIXED_TS
     result = UnifiedPageResult(
         page_number=1,
         extracted_text="Sample extracted text",
@@ -157,7 +184,7 @@ def test_unified_page_result():
 
 def test_unified_streaming_status():
     """Test UnifiedStreamingStatus model."""
-    timestamp = datetime.now(UTC)
+    timestamp = FIXED_TS
     status = UnifiedStreamingStatus(
         task_id="test-task-123",
         file_type=FileType.PDF,
@@ -187,7 +214,7 @@ def test_unified_streaming_status():
 
 def test_unified_ocr_response():
     """Test UnifiedOCRResponse model."""
-    created_at = datetime.now(UTC)
+    created_at = FIXED_TS
     metadata = FileMetadata(
         original_filename="test.pdf",
         file_size_bytes=1000000,
@@ -224,167 +251,175 @@ def test_task_cancellation_models():
     assert request.reason == "User requested cancellation"
 
 
-def test_model_integration():
-    """Test integration between different models."""
-    # 1. Create request
-    request = UnifiedOCRRequest(
+# --- Model Integration Tests ---
+
+@pytest.fixture
+def workflow_request():
+    """Request that starts the integration workflow."""
+    return UnifiedOCRRequest(
         mode=ProcessingMode.LLM_ENHANCED,
         threshold=550,
         prompt="Extract all text"
     )
-    
-    # 2. Create metadata
-    metadata = FileMetadata(
+
+
+@pytest.fixture
+def workflow_metadata():
+    """Metadata for the uploaded workflow file."""
+    return FileMetadata(
         original_filename="workflow_test.pdf",
         file_size_bytes=2000000,
         mime_type="application/pdf",
         detected_file_type=FileType.PDF,
         pdf_page_count=5
     )
-    
-    # 3. Create initial response
-    created_at = datetime.now(UTC)
-    response = UnifiedOCRResponse(
+
+
+@pytest.fixture
+def workflow_response(workflow_request, workflow_metadata):
+    """Initial response built from the request and metadata."""
+    return UnifiedOCRResponse(
         task_id="workflow-test",
         file_type=FileType.PDF,
-        processing_mode=request.mode,
+        processing_mode=workflow_request.mode,
         status="processing",
-        created_at=created_at,
-        file_metadata=metadata
+        created_at=FIXED_TS,
+        file_metadata=workflow_metadata
     )
-    
-    # 4. Create page result
-    page_result = UnifiedPageResult(
+
+
+@pytest.fixture
+def workflow_page_result(workflow_request):
+    """Page result produced with the request settings."""
+    return UnifiedPageResult(
         page_number=1,
         extracted_text="Sample page text",
         processing_time=3.2,
         success=True,
-        threshold_used=request.threshold,
-        contrast_level_used=request.contrast_level,
+        threshold_used=workflow_request.threshold,
+        contrast_level_used=workflow_request.contrast_level,
         model_used="gpt-4-vision-preview",
-        prompt_used=request.prompt,
-        timestamp=datetime.now(UTC)
+        prompt_used=workflow_request.prompt,
+        timestamp=FIXED_TS
     )
-    
-    # 5. Create streaming status
-    status = UnifiedStreamingStatus(
-        task_id=response.task_id,
-        file_type=response.file_type,
-        processing_mode=response.processing_mode,
+
+
+@pytest.fixture
+def workflow_status(workflow_response, workflow_metadata, workflow_page_result):
+    """Streaming status for the first completed page."""
+    return UnifiedStreamingStatus(
+        task_id=workflow_response.task_id,
+        file_type=workflow_response.file_type,
+        processing_mode=workflow_response.processing_mode,
         status="page_completed",
         current_step=ProcessingStep.OCR_PROCESSING,
         progress_percentage=20.0,
         current_page=1,
-        total_pages=metadata.pdf_page_count,
+        total_pages=workflow_metadata.pdf_page_count,
         processed_pages=1,
-        latest_page_result=page_result,
-        cumulative_results=[page_result],
-        timestamp=datetime.now(UTC)
+        latest_page_result=workflow_page_result,
+        cumulative_results=[workflow_page_result],
+        timestamp=FIXED_TS
     )
-    
-    # Verify all models work together
-    assert status.task_id == response.task_id
-    assert status.file_type == response.file_type
-    assert status.processing_mode == response.processing_mode
-    assert status.total_pages == metadata.pdf_page_count
-    assert status.latest_page_result.threshold_used == request.threshold
-    assert status.latest_page_result.prompt_used == request.prompt
-
-
-def test_json_round_trip_all_models():
-    """Test JSON serialization/deserialization for all models."""
-    models_to_test = [
-        UnifiedOCRRequest(mode=ProcessingMode.LLM_ENHANCED),
-        FileMetadata(
-            original_filename="test.jpg",
-            file_size_bytes=1000,
-            mime_type="image/jpeg",
-            detected_file_type=FileType.IMAGE
-        ),
-        UnifiedPageResult(
-            page_number=1,
-            extracted_text="Test",
-            processing_time=1.0,
-            success=True,
-            threshold_used=500,
-            contrast_level_used=1.3,
-            timestamp=datetime.now(UTC)
-        ),
-        UnifiedTaskCancellationRequest(reason="Test cancellation"),
-    ]
-    
-    for model in models_to_test:
-        # Serialize to JSON
-        json_str = model.model_dump_json()
-        assert isinstance(json_str, str)
-        assert len(json_str) > 0
-        
-        # Deserialize from JSON
-        model_class = type(model)
-        restored = model_class.model_validate_json(json_str)
-        
-        # Compare key fields (not exact equality due to datetime precision)
-        original_dict = model.model_dump()
-        restored_dict = restored.model_dump()
-        
-        # Check that both have the same keys
-        assert set(original_dict.keys()) == set(restored_dict.keys())
 
 
-# --- PDF Configuration Tests ---
+def test_status_matches_response(workflow_status, workflow_response):
+    """Test streaming status carries the response identity."""
+    assert workflow_status.task_id == workflow_response.task_id
+    assert workflow_status.file_type == workflow_response.file_type
+    assert workflow_status.processing_mode == workflow_response.processing_mode
 
-def test_pdf_config_defaults():
-    """Test PDFConfig default values."""
-    config = PDFConfig()
-    assert config.page_select is None
 
+def test_status_matches_metadata(workflow_status, workflow_metadata):
+    """Test streaming status page count comes from the file metadata."""
+    assert workflow_status.total_pages == workflow_metadata.pdf_page_count
 
-def test_pdf_config_valid_page_select():
-    """Test PDFConfig with valid page selection."""
-    config = PDFConfig(page_select=[1, 3, 5])
-    assert config.page_select == [1, 3, 5]
 
+def test_page_result_matches_request(workflow_status, workflow_request):
+    """Test page result carries the request settings."""
+    assert workflow_status.latest_page_result.threshold_used == workflow_request.threshold
+    assert workflow_status.latest_page_result.prompt_used == workflow_request.prompt
 
-def test_pdf_config_page_select_sorting():
-    """Test PDFConfig sorts page selection."""
-    config = PDFConfig(page_select=[5, 1, 3])
-    assert config.page_select == [1, 3, 5]
-
-
-def test_pdf_config_empty_page_select():
-    """Test PDFConfig rejects empty page selection."""
-    with pytest.raises(ValueError, match="page_select cannot be empty if provided"):
-        PDFConfig(page_select=[])
 
+_ROUND_TRIP_MODELS = [
+    UnifiedOCRRequest(mode=ProcessingMode.LLM_ENHANCED),
+    FileMetadata(
+        original_filename="test.jpg",
+        file_size_bytes=1000,
+        mime_type="image/jpeg",
+        detected_file_type=FileType.IMAGE
+    ),
+    UnifiedPageResult(
+        page_number=1,
+        extracted_text="Test",
+        processing_time=1.0,
+        success=True,
+        threshold_used=500,
+        contrast_level_used=1.3,
+        timestamp=FIXED_TS
+    ),
+    UnifiedTaskCancellationRequest(reason="Test cancellation"),
+]
 
-def test_pdf_config_invalid_page_numbers():
-    """Test PDFConfig rejects invalid page numbers."""
-    with pytest.raises(ValueError, match="Page numbers must be 1-indexed"):
-        PDFConfig(page_select=[0, 1, 2])
 
+_ADAPTERS = {
+    cls: TypeAdapter(cls)
+    for cls in (UnifiedOCRRequest, FileMetadata, UnifiedPageResult, UnifiedTaskCancellationRequest)
+}
 
-def test_pdf_config_duplicate_page_numbers():
-    """Test PDFConfig rejects duplicate page numbers."""
-    with pytest.raises(ValueError, match="Duplicate page numbers are not allowed"):
-        PDFConfig(page_select=[1, 2, 2, 3])
 
+@pytest.mark.parametrize(
+    "model", _ROUND_TRIP_MODELS,
+    ids=["request", "metadata", "page_result", "cancel_request"]
+)
+def test_json_round_trip_all_models(model):
+    """Test JSON serialization/deserialization for all models."""
+    adapter = _ADAPTERS[type(model)]
+    
+    # Serialize to JSON
+    json_bytes = adapter.dump_json(model)
+    assert json_bytes.startswith(b"{")
+    
+    # Deserialize from JSON
+    restored = adapter.validate_json(json_bytes)
+    
+    # Check that no field value was lost or altered in the round trip
+    assert restored == model
 
-def test_pdf_config_negative_page_numbers():
-    """Test PDFConfig rejects negative page numbers."""
-    with pytest.raises(ValueError, match="Page numbers must be 1-indexed"):
-        PDFConfig(page_select=[-1, 1, 2])
 
+# --- PDF Configuration Tests ---
 
-def test_unified_ocr_request_with_pdf_config():
-    """Test UnifiedOCRRequest with pdf_config field."""
-    pdf_config = PDFConfig(page_select=[1, 3, 5])
-    request = UnifiedOCRRequest(pdf_config=pdf_config)
+@pytest.mark.parametrize("kwargs,expected", [
+    ({}, None),
+    ({"page_select": [1, 3, 5]}, [1, 3, 5]),
+    ({"page_select": [5, 1, 3]}, [1, 3, 5]),
+], ids=["defaults", "valid", "sorted"])
+def test_pdf_config_valid(kwargs, expected):
+    """Test PDFConfig defaults, valid page selection and sorting."""
+    assert PDFConfig(**kwargs).page_select == expected
+
+
+@pytest.mark.parametrize("pages,msg", [
+    ([], "page_select cannot be empty if provided"),
+    ([0, 1, 2], "Page numbers must be 1-indexed"),
+    ([1, 2, 2, 3], "Duplicate page numbers are not allowed"),
+    ([-1, 1, 2], "Page numbers must be 1-indexed"),
+], ids=["empty", "zero", "duplicate", "negative"])
+def test_pdf_config_invalid(pages, msg):
+    """Test PDFConfig rejects invalid page selections."""
+    with pytest.raises(ValueError, match=msg):
+        PDFConfig(page_select=pages)
+
+
+@pytest.mark.parametrize("cfg,expected", [
+    (PDFConfig(page_select=[1, 3, 5]), [1, 3, 5]),
+    (None, None),
+], ids=["with_pdf_config", "without_pdf_config"])
+def test_unified_ocr_request_pdf_config(cfg, expected):
+    """Test UnifiedOCRRequest with and without the pdf_config field."""
+    request = UnifiedOCRRequest(pdf_config=cfg)
     
-    assert request.pdf_config is not None
-    assert request.pdf_config.page_select == [1, 3, 5]
-
-
-def test_unified_ocr_request_without_pdf_config():
-    """Test UnifiedOCRRequest without pdf_config field."""
-    request = UnifiedOCRRequest()
-    assert request.pdf_config is None 
\ No newline at end of file
+    if expected is None:
+        assert request.pdf_config is None
+    else:
+        assert request.pdf_config.page_select == expected
@@ -4,69 +4,95 @@ Unit tests for unified stream processor - testing file detection, processing, an
 
 import pytest
 import asyncio
+import inspect
 from unittest.mock import Mock, AsyncMock, patch, MagicMock
 from pathlib import Path
 from io import BytesIO
+from datetime import datetime, timezone
+import fitz
+from PIL import Image
 from fastapi import UploadFile, HTTPException
 
 from app.services.unified_stream_processor import (
     FileTypeDetector, MetadataExtractor, ProcessingTimeEstimator,
-    UnifiedStreamProcessor, unified_processor
+    UnifiedStreamProcessor, unified_processor, StreamingQueue, STREAMING_QUEUE_MAXSIZE
 )
 from app.models.unified_models import (
-    FileType, ProcessingMode, UnifiedOCRRequest, FileMetadata
+    FileType, ProcessingMode, ProcessingStep, UnifiedOCRRequest, FileMetadata
 )
+from app.models.ocr_models import STREAM_END, PDFStreamingStatus, PDFPageStreamResult
+
+pytestmark = pytest.mark.asyncio(loop_scope="session")
 
 
 class TestFileTypeDetector:
     """Test file type detection and validation."""
     
-    @pytest.mark.asyncio
     async def test_detect_image_from_mime_type(self):
         """Test image detection from MIME type."""
         mock_file = Mock(spec=UploadFile)
         mock_file.content_type = "image/jpeg"
         mock_file.filename = "test.jpg"
+        mock_file.read = AsyncMock(return_value=b"")
+        mock_file.seek = AsyncMock()
         
         file_type = await FileTypeDetector.detect_file_type(mock_file)
         assert file_type == FileType.IMAGE
     
-    @pytest.mark.asyncio
     async def test_detect_pdf_from_mime_type(self):
         """Test PDF detection from MIME type."""
         mock_file = Mock(spec=UploadFile)
         mock_file.content_type = "application/pdf"
         mock_file.filename = "document.pdf"
+        mock_file.read = AsyncMock(return_value=b"")
+        mock_file.seek = AsyncMock()
         
         file_type = await FileTypeDetector.detect_file_type(mock_file)
         assert file_type == FileType.PDF
     
-    @pytest.mark.asyncio
     async def test_detect_docx_from_mime_type(self):
         """Test DOCX detection from MIME type."""
         mock_file = Mock(spec=UploadFile)
         mock_file.content_type = "application/vnd.openxmlformats-officedocument.wordprocessingml.document"
         mock_file.filename = "report.docx"
+        mock_file.read = AsyncMock(return_value=b"")
+        mock_file.seek = AsyncMock()
         
         file_type = await FileTypeDetector.detect_file_type(mock_file)
         assert file_type == FileType.DOCX
     
-    @pytest.mark.asyncio
     async def test_detect_from_extension_fallback(self):
         """Test file type detection from extension when MIME type is unknown."""
         mock_file = Mock(spec=UploadFile)
         mock_file.content_type = "application/octet-stream"  # Generic MIME type
         mock_file.filename = "image.png"
+        mock_file.read = AsyncMock(return_value=b"")
+        mock_file.seek = AsyncMock()
         
         file_type = await FileTypeDetector.detect_file_type(mock_file)
         assert file_type == FileType.IMAGE
     
-    @pytest.mark.asyncio
+    async def test_detect_from_magic_bytes(self):
+        """Test file signature takes precedence over a generic MIME type and name."""
+        mock_file = Mock(spec=UploadFile)
+        mock_file.content_type = "application/octet-stream"
+        mock_file.filename = "upload.bin"
+        mock_file.read = AsyncMock(return_value=b"\x89PNG\r\n\x1a\n" + b"\x00" * 56)
+        mock_file.seek = AsyncMock()
+        
+        file_type = await FileTypeDetector.detect_file_type(mock_file)
+        
+        assert file_type == FileType.IMAGE
+        mock_file.read.assert_awaited_once_with(64)
+        mock_file.seek.assert_awaited_once_with(0)
+    
     async def test_unsupported_file_type(self):
         """Test exception for unsupported file types."""
         mock_file = Mock(spec=UploadFile)
         mock_file.content_type = "text/plain"
         mock_file.filename = "document.txt"
+        mock_file.read = AsyncMock(return_value=b"")
+        mock_file.seek = AsyncMock()
         
         with pytest.raises(HTTPException) as exc_info:
             await FileTypeDetector.detect_file_type(mock_file)
@@ -74,7 +100,6 @@ class TestFileTypeDetector:
         assert exc_info.value.status_code == 400
         assert "Unsupported file type" in str(exc_info.value.detail)
     
-    @pytest.mark.asyncio
     async def test_validate_file_size_success(self):
         """Test successful file size validation."""
         mock_file = Mock(spec=UploadFile)
@@ -83,7 +108,6 @@ class TestFileTypeDetector:
         # Should not raise exception
         await FileTypeDetector.validate_file_size(mock_file, FileType.IMAGE)
     
-    @pytest.mark.asyncio
     async def test_validate_file_size_too_large(self):
         """Test file size validation failure."""
         mock_file = Mock(spec=UploadFile)
@@ -99,62 +123,55 @@ class TestFileTypeDetector:
 class TestMetadataExtractor:
     """Test metadata extraction for different file types."""
     
-    @pytest.mark.asyncio
-    async def test_extract_image_metadata_success(self):
+    async def test_extract_image_metadata_success(self, tmp_path):
         """Test successful image metadata extraction."""
-        # Create a mock image file path
-        mock_path = Mock(spec=Path)
+        image_path = tmp_path / "test.png"
+        Image.new('RGB', (1920, 1080), color='white').save(image_path)
         
-        with patch('PIL.Image.open') as mock_image_open:
-            # Mock PIL Image
-            mock_image = Mock()
-            mock_image.width = 1920
-            mock_image.height = 1080
-            mock_image_open.return_value.__enter__ = Mock(return_value=mock_image)
-            mock_image_open.return_value.__exit__ = Mock(return_value=None)
-            
-            metadata = await MetadataExtractor.extract_image_metadata(mock_path)
-            
-            assert metadata == {"width": 1920, "height": 1080}
+        metadata = await MetadataExtractor.extract_image_metadata(image_path)
+        
+        assert metadata == {"width": 1920, "height": 1080}
     
-    @pytest.mark.asyncio
-    async def test_extract_image_metadata_failure(self):
+    async def test_extract_image_metadata_non_png(self, tmp_path):
+        """Test image metadata extraction falls back to PIL for non-PNG images."""
+        image_path = tmp_path / "test.jpg"
+        Image.new('RGB', (640, 480), color='white').save(image_path)
+        
+        metadata = await MetadataExtractor.extract_image_metadata(image_path)
+        
+        assert metadata == {"width": 640, "height": 480}
+    
+    async def test_extract_image_metadata_failure(self, tmp_path):
         """Test image metadata extraction with error handling."""
-        mock_path = Mock(spec=Path)
+        image_path = tmp_path / "broken.png"
+        image_path.write_bytes(b"not an image")
         
-        with patch('PIL.Image.open', side_effect=Exception("Cannot open image")):
-            metadata = await MetadataExtractor.extract_image_metadata(mock_path)
-            
-            assert metadata == {"width": 0, "height": 0}
+        metadata = await MetadataExtractor.extract_image_metadata(image_path)
+        
+        assert metadata == {"width": 0, "height": 0}
     
-    @pytest.mark.asyncio
-    async def test_extract_pdf_metadata_success(self):
+    async def test_extract_pdf_metadata_success(self, tmp_path):
         """Test successful PDF metadata extraction."""
-        mock_path = Mock(spec=Path)
+        pdf_path = tmp_path / "test.pdf"
+        doc = fitz.open()
+        for _ in range(5):
+            doc.new_page()
+        doc.save(pdf_path)
+        doc.close()
         
-        with patch('fitz.open') as mock_fitz_open:
-            # Mock PyMuPDF document
-            mock_doc = Mock()
-            mock_doc.__len__ = Mock(return_value=5)  # 5 pages
-            mock_doc.close = Mock()
-            mock_fitz_open.return_value = mock_doc
-            
-            page_count = await MetadataExtractor.extract_pdf_metadata(mock_path)
-            
-            assert page_count == 5
-            mock_doc.close.assert_called_once()
+        page_count = await MetadataExtractor.extract_pdf_metadata(pdf_path)
+        
+        assert page_count == 5
     
-    @pytest.mark.asyncio
-    async def test_extract_pdf_metadata_failure(self):
+    async def test_extract_pdf_metadata_failure(self, tmp_path):
         """Test PDF metadata extraction with error handling."""
-        mock_path = Mock(spec=Path)
+        pdf_path = tmp_path / "broken.pdf"
+        pdf_path.write_bytes(b"not a pdf")
         
-        with patch('fitz.open', side_effect=Exception("Cannot open PDF")):
-            page_count = await MetadataExtractor.extract_pdf_metadata(mock_path)
-            
-            assert page_count == 0
+        page_count = await MetadataExtractor.extract_pdf_metadata(pdf_path)
+        
+        assert page_count == 0
     
-    @pytest.mark.asyncio
     async def test_extract_docx_metadata(self):
         """Test DOCX metadata extraction (file size estimation)."""
         mock_path = Mock(spec=Path)
@@ -214,46 +231,134 @@ class TestProcessingTimeEstimator:
 class TestUnifiedStreamProcessor:
     """Test the main unified stream processor."""
     
-    def setup_method(self):
-        """Set up test fixtures."""
-        self.processor = UnifiedStreamProcessor()
+    @pytest.fixture(scope="class")
+    def shared_processor(self):
+        """Create one processor for the whole class."""
+        return UnifiedStreamProcessor()
+    
+    @pytest.fixture
+    def processor(self, shared_processor):
+        """Provide the shared processor and reset its task state afterwards."""
+        yield shared_processor
+        shared_processor.streaming_queues.clear()
+        shared_processor.task_metadata.clear()
     
-    def test_initialization(self):
+    def test_initialization(self, processor):
         """Test processor initialization."""
-        assert isinstance(self.processor.file_detector, FileTypeDetector)
-        assert isinstance(self.processor.metadata_extractor, MetadataExtractor)
-        assert isinstance(self.processor.time_estimator, ProcessingTimeEstimator)
-        assert isinstance(self.processor.streaming_queues, dict)
-        assert isinstance(self.processor.task_metadata, dict)
-    
-    @pytest.mark.asyncio
-    async def test_save_uploaded_file(self):
-        """Test file saving functionality."""
-        # Create mock upload file
+        assert isinstance(processor.file_detector, FileTypeDetector)
+        assert isinstance(processor.metadata_extractor, MetadataExtractor)
+        assert isinstance(processor.time_estimator, ProcessingTimeEstimator)
+        assert isinstance(processor.streaming_queues, dict)
+        assert isinstance(processor.task_metadata, dict)
+    
+    def test_streaming_queue_bounded(self, processor):
+        """Test streaming queues are registered and bounded."""
+        queue = processor._create_streaming_queue("bounded-task")
+        
+        assert processor.streaming_queues["bounded-task"] is queue
+        assert isinstance(queue, StreamingQueue)
+        assert queue.maxsize == STREAMING_QUEUE_MAXSIZE
+    
+    async def test_streaming_queue_producer_finishes_without_consumer(self, processor):
+        """Test a producer with no SSE consumer is never stalled by a full queue."""
+        task_id = "no-consumer-task"
+        queue = processor._create_streaming_queue(task_id)
+        
+        async def produce():
+            for i in range(40):
+                await processor._send_progress_update(
+                    task_id, FileType.IMAGE, ProcessingMode.LLM_ENHANCED, "processing",
+                    ProcessingStep.LLM_ENHANCEMENT, 80.0, "Streaming LLM response...",
+                    text_chunk=f"chunk {i}"
+                )
+            await processor._send_progress_update(
+                task_id, FileType.IMAGE, ProcessingMode.LLM_ENHANCED, "completed",
+                ProcessingStep.COMPLETED, 100.0, "Image processing completed"
+            )
+        
+        await asyncio.wait_for(produce(), timeout=1.0)
+        
+        assert queue.qsize() == STREAMING_QUEUE_MAXSIZE
+        updates = [queue.get_nowait() for _ in range(queue.qsize())]
+        assert updates[0].text_chunk == "chunk 9"  # Oldest updates were dropped
+        assert updates[-1].status == "completed"
+    
+    async def test_streaming_queue_backpressure_times_out(self):
+        """Test an attached but stalled consumer only delays the producer briefly."""
+        queue = StreamingQueue(maxsize=2, put_timeout=0.01)
+        queue.consumer_attached = True
+        await queue.put("first")
+        await queue.put("second")
+        
+        await asyncio.wait_for(queue.put("third"), timeout=1.0)
+        
+        assert [queue.get_nowait(), queue.get_nowait()] == ["second", "third"]
+    
+    async def test_streaming_queue_never_blocks_stream_end(self):
+        """Test the end-of-stream sentinel is enqueued without waiting."""
+        queue = StreamingQueue(maxsize=1, put_timeout=60.0)
+        queue.consumer_attached = True
+        await queue.put("update")
+        
+        await asyncio.wait_for(queue.put(STREAM_END), timeout=1.0)
+        
+        assert queue.get_nowait() is STREAM_END
+    
+    async def test_streaming_queue_late_consumer_rebuilds_pdf_pages(self):
+        """Test dropped PDF delta frames are recovered through a snapshot."""
+        queue = StreamingQueue()
+        total_pages = 40
+        
+        for page in range(1, total_pages + 1):
+            await queue.put(PDFStreamingStatus(
+                task_id="late-consumer-task",
+                status="page_completed",
+                current_page=page,
+                total_pages=total_pages,
+                processed_pages=page,
+                latest_page_result=PDFPageStreamResult(
+                    page_number=page,
+                    extracted_text=f"page {page}",
+                    processing_time=0.1,
+                    success=True,
+                    threshold_used=500,
+                    contrast_level_used=1.3,
+                    timestamp=datetime.now(timezone.utc)
+                ),
+                cumulative_results=[],
+                is_snapshot=False,
+                progress_percentage=page / total_pages * 100,
+                timestamp=datetime.now(timezone.utc)
+            ))
+        
+        # A late consumer rebuilds state the way the documented client does
+        pages = {}
+        while not queue.empty():
+            update = queue.get_nowait()
+            if update.is_snapshot:
+                pages = {r.page_number: r for r in update.cumulative_results}
+            pages[update.latest_page_result.page_number] = update.latest_page_result
+        
+        assert sorted(pages) == list(range(1, total_pages + 1))
+        assert pages[1].extracted_text == "page 1"
+    
+    async def test_save_uploaded_file(self, processor, tmp_path):
+        """Test uploaded file is streamed to disk chunk by chunk."""
+        # Create mock upload file yielding two chunks, then EOF
         mock_file = Mock(spec=UploadFile)
         mock_file.filename = "test.jpg"
-        mock_file.read = AsyncMock(return_value=b"fake image data")
+        mock_file.read = AsyncMock(side_effect=[b"fake ", b"image data", b""])
         
         task_id = "test-task-123"
         
-        with patch('pathlib.Path.mkdir'), \
-             patch('builtins.open', mock_open := Mock()) as mock_open_func:
-            
-            # Mock the file operations
-            mock_open_func.return_value.__enter__ = Mock()
-            mock_open_func.return_value.__exit__ = Mock()
-            mock_open_func.return_value.write = Mock()
-            
-            with patch('app.services.unified_stream_processor.settings') as mock_settings:
-                mock_settings.UPLOAD_DIR = "/tmp/uploads"
-                
-                file_path = await self.processor._save_uploaded_file(mock_file, task_id)
-                
-                assert str(file_path).endswith(f"{task_id}.jpg")
-                mock_file.read.assert_called_once()
-    
-    @pytest.mark.asyncio
-    async def test_extract_file_metadata_image(self):
+        with patch('app.services.unified_stream_processor.settings.UPLOAD_DIR', str(tmp_path)):
+            file_path = await processor._save_uploaded_file(mock_file, task_id)
+        
+        assert file_path == tmp_path / f"{task_id}.jpg"
+        assert file_path.read_bytes() == b"fake image data"
+        assert mock_file.read.await_count == 3
+    
+    async def test_extract_file_metadata_image(self, processor):
         """Test file metadata extraction for images."""
         mock_file = Mock(spec=UploadFile)
         mock_file.filename = "test.jpg"
@@ -262,11 +367,11 @@ class TestUnifiedStreamProcessor:
         
         mock_path = Mock(spec=Path)
         
-        with patch.object(self.processor.metadata_extractor, 'extract_image_metadata', 
+        with patch.object(processor.metadata_extractor, 'extract_image_metadata', 
                          new_callable=AsyncMock) as mock_extract:
             mock_extract.return_value = {"width": 1920, "height": 1080}
             
-            metadata = await self.processor._extract_file_metadata(
+            metadata = await processor._extract_file_metadata(
                 mock_file, FileType.IMAGE, mock_path
             )
             
@@ -278,8 +383,7 @@ class TestUnifiedStreamProcessor:
             assert metadata.pdf_page_count is None
             assert metadata.docx_page_count is None
     
-    @pytest.mark.asyncio
-    async def test_process_file_stream_image_detection(self):
+    async def test_process_file_stream_image_detection(self, processor):
         """Test the main process_file_stream method with image detection."""
         # Create mock upload file
         mock_file = Mock(spec=UploadFile)
@@ -293,15 +397,15 @@ class TestUnifiedStreamProcessor:
         task_id = "test-task-456"
         
         # Mock all the dependencies
-        with patch.object(self.processor.file_detector, 'detect_file_type', 
+        with patch.object(processor.file_detector, 'detect_file_type', 
                          new_callable=AsyncMock) as mock_detect, \
-             patch.object(self.processor.file_detector, 'validate_file_size', 
+             patch.object(processor.file_detector, 'validate_file_size', 
                          new_callable=AsyncMock) as mock_validate, \
-             patch.object(self.processor, '_save_uploaded_file', 
+             patch.object(processor, '_save_uploaded_file', 
                          new_callable=AsyncMock) as mock_save, \
-             patch.object(self.processor, '_extract_file_metadata', 
+             patch.object(processor, '_extract_file_metadata', 
                          new_callable=AsyncMock) as mock_extract, \
-             patch.object(self.processor, '_send_progress_update', 
+             patch.object(processor, '_send_progress_update', 
                          new_callable=AsyncMock) as mock_progress, \
              patch('asyncio.create_task') as mock_create_task:
             
@@ -317,7 +421,7 @@ class TestUnifiedStreamProcessor:
             )
             
             # Execute
-            response = await self.processor.process_file_stream(
+            response = await processor.process_file_stream(
                 file=mock_file,
                 request=request,
                 task_id=task_id
@@ -338,18 +442,20 @@ class TestUnifiedStreamProcessor:
             mock_progress.assert_called_once()
             mock_create_task.assert_called_once()
     
-    @pytest.mark.asyncio
-    async def test_get_stream_generator_not_found(self):
+    def test_stream_generator_is_async(self):
+        """Test stream generator is a native async generator (no threadpool offload)."""
+        assert inspect.isasyncgenfunction(UnifiedStreamProcessor.get_stream_generator)
+    
+    async def test_get_stream_generator_not_found(self, processor):
         """Test stream generator for non-existent task."""
         with pytest.raises(HTTPException) as exc_info:
-            async for _ in self.processor.get_stream_generator("non-existent-task"):
+            async for _ in processor.get_stream_generator("non-existent-task"):
                 pass
         
         assert exc_info.value.status_code == 404
         assert "not found" in str(exc_info.value.detail).lower()
     
-    @pytest.mark.asyncio
-    async def test_get_stream_generator_with_updates(self):
+    async def test_get_stream_generator_with_updates(self, processor):
         """Test stream generator with mock updates."""
         task_id = "test-stream-task"
         
@@ -374,53 +480,48 @@ class TestUnifiedStreamProcessor:
         await mock_queue.put(test_status)
         
         # Add queue to processor
-        self.processor.streaming_queues[task_id] = mock_queue
+        processor.streaming_queues[task_id] = mock_queue
         
         # Test generator
         updates = []
-        async for update in self.processor.get_stream_generator(task_id):
+        async for update in processor.get_stream_generator(task_id):
             updates.append(update)
             # Break after first update since status is "completed"
             break
         
         assert len(updates) == 1
-        assert f'"task_id":"{task_id}"' in updates[0]
-        assert '"status":"completed"' in updates[0]
-        
-        # Cleanup
-        if task_id in self.processor.streaming_queues:
-            del self.processor.streaming_queues[task_id]
+        assert updates[0].startswith(b"data: ")
+        assert f'"task_id":"{task_id}"'.encode() in updates[0]
+        assert b'"status":"completed"' in updates[0]
     
-    @pytest.mark.asyncio
-    async def test_cleanup_task(self):
+    async def test_cleanup_task(self, processor):
         """Test task cleanup functionality."""
         task_id = "cleanup-test-task"
         
         # Set up task data
         mock_queue = asyncio.Queue()
-        self.processor.streaming_queues[task_id] = mock_queue
+        processor.streaming_queues[task_id] = mock_queue
         
         mock_file_path = Mock(spec=Path)
         mock_file_path.exists.return_value = True
         mock_file_path.unlink = Mock()
         
-        self.processor.task_metadata[task_id] = {
+        processor.task_metadata[task_id] = {
             "file_path": mock_file_path,
             "file_type": FileType.IMAGE
         }
         
         # Execute cleanup
-        await self.processor._cleanup_task(task_id)
+        await processor._cleanup_task(task_id)
         
         # Verify cleanup
-        assert task_id not in self.processor.streaming_queues
+        assert task_id not in processor.streaming_queues
         # Note: task_metadata cleanup depends on implementation
 
 
 class TestUnifiedProcessorIntegration:
     """Test integration scenarios with the unified processor."""
     
-    @pytest.mark.asyncio
     async def test_processor_error_handling(self):
         """Test error handling in processor."""
         processor = UnifiedStreamProcessor()
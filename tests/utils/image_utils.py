@@ -1,8 +1,12 @@
-import base64
+import binascii
+import functools
 import os
 from pathlib import Path
 from typing import Optional
 
+# Read size for base64 encoding; 57 KB is divisible by 3
+ENCODE_CHUNK_SIZE = 57 * 1024
+
 
 class ImageUtils:
     """Utility class for image processing in tests."""
@@ -28,12 +32,21 @@ class ImageUtils:
             
         try:
             with open(image_path, "rb") as image_file:
-                image_data = image_file.read()
-                base64_string = base64.b64encode(image_data).decode('utf-8')
+                # Chunks are a multiple of 3 bytes so each encodes without padding
+                # and lands directly in a buffer pre-sized for the whole output
+                file_size = os.fstat(image_file.fileno()).st_size
+                buffer = bytearray(((file_size + 2) // 3) * 4)
+                offset = 0
+                while chunk := image_file.read(ENCODE_CHUNK_SIZE):
+                    encoded = binascii.b2a_base64(chunk, newline=False)
+                    buffer[offset:offset + len(encoded)] = encoded
+                    offset += len(encoded)
+                del buffer[offset:]  # In case the file shrank while reading
+                base64_string = buffer.decode('ascii')
                 
                 if enable_logging:
                     print(f"Image: {image_path}")
-                    print(f"File size: {len(image_data)} bytes ({len(image_data)/1024:.1f} KB)")
+                    print(f"File size: {file_size} bytes ({file_size/1024:.1f} KB)")
                     print(f"Base64 length: {len(base64_string)} characters")
                     print(f"Base64 preview: {base64_string[:50]}...")
                     
@@ -43,6 +56,7 @@ class ImageUtils:
             raise Exception(f"Failed to encode image {image_path}: {str(e)}")
     
     @staticmethod
+    @functools.lru_cache(maxsize=1)
     def get_test_image_path() -> str:
         """Get the path to the test image file."""
         project_root = Path(__file__).parent.parent.parent
@@ -61,7 +75,11 @@ class ImageUtils:
             Base64 encoded string of test_image.png
         """
         test_image_path = ImageUtils.get_test_image_path()
-        return ImageUtils.encode_image_to_base64(test_image_path, enable_logging)
+        if enable_logging:
+            return ImageUtils.encode_image_to_base64(test_image_path, enable_logging)
+        
+        st = os.stat(test_image_path)
+        return _encode_cached(test_image_path, st.st_mtime_ns, st.st_size)
     
     @staticmethod
     def validate_base64_encoding(base64_string: str) -> bool:
@@ -78,11 +96,15 @@ class ImageUtils:
             return False
             
         try:
-            # Try to decode and re-encode
-            decoded = base64.b64decode(base64_string)
-            re_encoded = base64.b64encode(decoded).decode('utf-8')
-            return re_encoded == base64_string and len(base64_string) > 0
-        except Exception:
+            data = base64_string.encode('ascii')
+            if len(data) % 4:
+                return False
+            # Single strict decode pass, then a canonical check that re-encodes
+            # only the last quantum (excess padding, non-zero trailing bits)
+            binascii.a2b_base64(data, strict_mode=True)
+            tail = data[-4:]
+            return binascii.b2a_base64(binascii.a2b_base64(tail), newline=False) == tail
+        except (binascii.Error, ValueError):
             return False
     
     @staticmethod
@@ -96,22 +118,32 @@ class ImageUtils:
         Returns:
             Dictionary with image information
         """
-        if not os.path.exists(image_path):
-            return {"error": f"File not found: {image_path}"}
-            
+        image_path = os.fspath(image_path)
         try:
-            file_size = os.path.getsize(image_path)
-            file_extension = Path(image_path).suffix.lower()
-            
-            return {
-                "path": image_path,
-                "size_bytes": file_size,
-                "size_kb": round(file_size / 1024, 2),
-                "extension": file_extension,
-                "exists": True
-            }
-        except Exception as e:
+            st = os.stat(image_path)
+        except FileNotFoundError:
+            return {"error": f"File not found: {image_path}"}
+        except OSError as e:
             return {"error": f"Failed to get info: {str(e)}"}
+            
+        return {
+            "path": image_path,
+            "size_bytes": st.st_size,
+            "size_kb": round(st.st_size / 1024, 2),
+            "extension": Path(image_path).suffix.lower(),
+            "exists": True
+        }
+
+
+@functools.lru_cache(maxsize=8)
+def _encode_cached(image_path: str, mtime_ns: int, size: int) -> str:
+    """
+    Encode an image once per (path, mtime, size) and reuse the result.
+    
+    Call _encode_cached.cache_clear() after rewriting a file within the
+    same mtime granularity.
+    """
+    return ImageUtils.encode_image_to_base64(image_path)
 
 
 # Convenience functions for easy import
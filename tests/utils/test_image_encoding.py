@@ -4,8 +4,13 @@ Test script for image encoding utilities.
 This can be run standalone to test image encoding without cluttering test logs.
 """
 
+import base64
+import os
 import sys
 from pathlib import Path
+from unittest.mock import patch
+
+import pytest
 
 # Add project root to path for imports
 project_root = Path(__file__).parent.parent.parent
@@ -15,7 +20,8 @@ from tests.utils.image_utils import (
     encode_test_image, 
     validate_base64, 
     get_test_image_info, 
-    ImageUtils
+    ImageUtils,
+    ENCODE_CHUNK_SIZE
 )
 
 
@@ -49,6 +55,49 @@ def test_image_encoding_with_logging():
     return base64_string
 
 
+@pytest.mark.parametrize("base64_string, expected", [
+    ("QUJD", True),
+    ("QUI=", True),
+    ("QQ==", True),
+    ("", False),
+    ("QUJ", False),          # Length not a multiple of 4
+    ("QR==", False),         # Non-zero trailing bits
+    ("QUJD====", False),     # Excess padding
+    ("QU=D", False),         # Padding in the middle
+    ("QUJD\n", False),       # Whitespace
+    ("QUJ*", False),         # Invalid character
+    ("QUJDé===", False),     # Non-ASCII
+])
+def test_validate_base64(base64_string, expected):
+    """Test base64 validation accepts only canonical encodings."""
+    assert validate_base64(base64_string) is expected
+
+
+def test_encode_multi_chunk_file(tmp_path):
+    """Test chunked encoding matches base64.b64encode across chunk boundaries."""
+    data = os.urandom(ENCODE_CHUNK_SIZE * 2 + 1)  # Not a multiple of 3
+    image_path = tmp_path / "large.bin"
+    image_path.write_bytes(data)
+    
+    assert ImageUtils.encode_image_to_base64(str(image_path)) == base64.b64encode(data).decode()
+
+
+def test_cached_encoding_refreshes_after_rewrite(tmp_path):
+    """Test the cached test image encoding follows a rewritten file."""
+    image_path = tmp_path / "test_image.png"
+    image_path.write_bytes(b"first image")
+    
+    with patch.object(ImageUtils, "get_test_image_path", return_value=str(image_path)):
+        assert ImageUtils.create_test_base64_image() == base64.b64encode(b"first image").decode()
+        
+        # Bump the mtime explicitly in case the filesystem clock is coarse
+        mtime_ns = image_path.stat().st_mtime_ns
+        image_path.write_bytes(b"second image")
+        os.utime(image_path, ns=(mtime_ns, mtime_ns + 1_000_000_000))
+        
+        assert ImageUtils.create_test_base64_image() == base64.b64encode(b"second image").decode()
+
+
 def main():
     """Run all image encoding tests."""
     print("=== Image Encoding Utility Test ===\n")